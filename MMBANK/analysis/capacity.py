@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from MMBANK.utils.materials_imput import as_frame
+
+
+PLAN_COLUMNS = ["runs", "units", "line_hours", "capital", "cargo_m3", "planned_profit"]
+
+
+def plan_production(
+        table,
+        lines,
+        horizon_hours: float,
+        budget: float,
+        absorption: float = 0.1,
+        profit_column: str = "sell_profit_isk",
+        cost_column: str = "Total_production_price",
+        market_volume_column: str = "sellVolume",
+        line_column: str | None = None,
+        max_m3: float | None = None,
+        time_limit: float = 10,
+        output_csv: str | None = None,
+) -> pd.DataFrame:
+    df = as_frame(table).reset_index(drop=True)
+
+    profit = df[profit_column].astype(float).to_numpy()
+    cost = df[cost_column].astype(float).to_numpy()
+    quantity = df["quantity"].astype(float).to_numpy()
+    hours = df["job_seconds"].astype(float).to_numpy() / 3600
+    volume = df["volume_m3"].astype(float).fillna(0).to_numpy()
+
+    # Anything unprofitable, unpriced or missing job data is zeroed out so milp never sees a NaN or inf coefficient.
+    usable = (
+        np.isfinite(profit) & np.isfinite(cost) & np.isfinite(quantity) & np.isfinite(hours)
+        & (profit > 0) & (quantity > 0) & (hours > 0)
+    )
+    profit, cost, quantity, hours = (np.where(usable, x, 0) for x in (profit, cost, quantity, hours))
+    volume = np.where(np.isfinite(volume), volume, 0)
+
+    # Market absorption caps units sold over the horizon; unusable rows are pinned to zero runs.
+    market_units = absorption * df[market_volume_column].astype(float).fillna(0).to_numpy()
+    max_runs = np.where(usable, np.floor(market_units / np.where(usable, quantity, 1)), 0)
+
+    run_profit = profit * quantity
+    rows, upper = [], []
+
+    if isinstance(lines, dict):
+        if line_column is None:
+            raise ValueError("line_column is required when lines is a dict")
+        groups = df[line_column].to_numpy()
+        for group, count in lines.items():
+            rows.append(np.where(groups == group, hours, 0))
+            upper.append(count * horizon_hours)
+        line_count = np.array([lines.get(group, 0) for group in groups], dtype=np.float64)
+    else:
+        rows.append(hours)
+        upper.append(lines * horizon_hours)
+        line_count = np.full(len(df), float(lines))
+
+    # A run cannot be split across lines, so each line fits only whole runs within the horizon.
+    runs_per_line = np.floor(horizon_hours / np.where(usable, hours, np.inf))
+    max_runs = np.minimum(max_runs, runs_per_line * line_count)
+
+    rows.append(cost * quantity)
+    upper.append(budget)
+
+    if max_m3 is not None:
+        rows.append(volume * quantity)
+        upper.append(max_m3)
+
+    result = milp(
+        c=-run_profit,
+        constraints=LinearConstraint(np.vstack(rows), -np.inf, np.array(upper)),
+        integrality=np.ones(len(df)),
+        bounds=Bounds(0, max_runs),
+        options={"time_limit": time_limit},
+    )
+
+    if result.x is None:
+        raise RuntimeError(f"Production plan failed: {result.message}")
+
+    runs = np.round(result.x).astype(np.int64)
+
+    df["runs"] = runs
+    df["units"] = runs * quantity
+    df["line_hours"] = runs * hours
+    df["capital"] = runs * quantity * cost
+    df["cargo_m3"] = runs * quantity * volume
+    df["planned_profit"] = runs * run_profit
+
+    plan = df[df["runs"] > 0].sort_values(by="planned_profit", ascending=False)
+    if output_csv is not None:
+        plan.to_csv(output_csv, index=False)
+
+    return plan
@@ -0,0 +1,164 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from MMBANK.reactions.reaction_production import base_job_values, explode_materials
+from MMBANK.utils.jump_graph import load_jump_graph
+from MMBANK.utils.materials_imput import as_frame
+from MMBANK.utils.response_cache import cached_get_json
+
+
+ESI_INDUSTRY_SYSTEMS_URL = "https://esi.evetech.net/latest/industry/systems/?datasource=tranquility"
+
+ACTIVITY_NAMES = {
+    1: "manufacturing",
+    3: "researching_time_efficiency",
+    4: "researching_material_efficiency",
+    5: "copying",
+    8: "invention",
+    11: "reaction",
+}
+
+
+def cost_index_table(systems: list) -> pd.DataFrame:
+    rows = [
+        {"solar_system_id": system["solar_system_id"], "activity": entry["activity"], "cost_index": entry["cost_index"]}
+        for system in systems
+        for entry in system.get("cost_indices", [])
+    ]
+    long_df = pd.DataFrame(rows, columns=["solar_system_id", "activity", "cost_index"])
+
+    return _wide(long_df)
+
+
+def _wide(long_df: pd.DataFrame) -> pd.DataFrame:
+    wide = long_df.pivot_table(index="solar_system_id", columns="activity", values="cost_index", aggfunc="last")
+    wide = wide.reindex(columns=list(ACTIVITY_NAMES.values()))
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+def fetch_cost_indices(bypass_cache: bool = False) -> pd.DataFrame:
+    systems = cached_get_json(ESI_INDUSTRY_SYSTEMS_URL, "esi/industry/systems", bypass_cache=bypass_cache)
+    if systems is None:
+        raise RuntimeError("Failed to fetch industry cost indices")
+
+    return cost_index_table(systems)
+
+
+def load_cost_indices(path: str) -> pd.DataFrame:
+    # Accepts a raw /industry/systems/ JSON dump, or a CSV in long (activity, cost_index) or wide form.
+    if path.endswith(".json"):
+        with open(path) as f:
+            return cost_index_table(json.load(f))
+
+    df = pd.read_csv(path)
+    if "activity" in df.columns:
+        return _wide(df)
+
+    return df
+
+
+def _cost_indices(cost_indices) -> pd.DataFrame:
+    if cost_indices is None:
+        return fetch_cost_indices()
+    if isinstance(cost_indices, str):
+        return load_cost_indices(cost_indices)
+    return cost_indices
+
+
+def system_cost_index(system, activity_id: int = 1, cost_indices=None) -> float | None:
+    graph = load_jump_graph()
+    system_id = int(graph.system_ids[graph.slot(system)])
+
+    df = _cost_indices(cost_indices)
+    match = df.loc[df["solar_system_id"] == system_id, ACTIVITY_NAMES[activity_id]]
+    if match.empty or pd.isna(match.iloc[0]):
+        return None
+
+    return float(match.iloc[0])
+
+
+def job_cost_matrix(
+        base_values: np.ndarray,
+        cost_index: np.ndarray,
+        structure_discount: float = 0,
+        facility_tax: float = 0,
+        scc_tax: float = 0.04,
+) -> np.ndarray:
+    # systems x blueprints: one job rate per system scaled by each blueprint's estimated item value.
+    job_rate = np.asarray(cost_index, dtype=np.float64) * (1 - structure_discount) + facility_tax + scc_tax
+    return job_rate[:, None] * np.asarray(base_values, dtype=np.float64)[None, :]
+
+
+def cheapest_facilities(
+        bpo_csv,
+        prices,
+        home,
+        max_jumps: int,
+        cost_indices=None,
+        activity_id: int = 1,
+        highsec_only: bool = False,
+        structure_discount: float = 0,
+        facility_tax: float = 0,
+        scc_tax: float = 0.04,
+        output_csv: str | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    activity = ACTIVITY_NAMES[activity_id]
+
+    graph = load_jump_graph()
+    home_id = int(graph.system_ids[graph.slot(home)])
+
+    candidates = graph.within(home, max_jumps, highsec_only=highsec_only).merge(
+        _cost_indices(cost_indices)[["solar_system_id", activity]].rename(columns={activity: "cost_index"}),
+        on="solar_system_id",
+        how="inner",
+    )
+    candidates = candidates[candidates["cost_index"].notna()].reset_index(drop=True)
+    if candidates.empty:
+        raise ValueError(f"No systems with a {activity} cost index within {max_jumps} jumps of {home}")
+
+    blueprints, materials = explode_materials(as_frame(bpo_csv))
+    base_values = base_job_values(blueprints, materials, as_frame(prices))
+
+    quantity = blueprints["quantity"].to_numpy(dtype=np.float64)
+    quantity = np.where(quantity <= 0, 1, quantity)
+    runs = blueprints["runs"].to_numpy(dtype=np.float64) if "runs" in blueprints.columns else np.ones(len(blueprints))
+
+    costs = job_cost_matrix(
+        base_values,
+        candidates["cost_index"].to_numpy(),
+        structure_discount=structure_discount,
+        facility_tax=facility_tax,
+        scc_tax=scc_tax,
+    )
+
+    # Candidates are ordered by distance, so argmin settles ties on the closest system.
+    best = np.argmin(costs, axis=0)
+    cols = np.arange(len(blueprints))
+    at_home = np.flatnonzero(candidates["solar_system_id"].to_numpy() == home_id)
+    home_cost = costs[at_home[0]] if len(at_home) else np.full(len(blueprints), np.nan)
+
+    per_product = pd.DataFrame({
+        "name": blueprints["name"].to_numpy(),
+        "item_id": blueprints["item_id"].to_numpy(),
+        "EIV_value": np.round(base_values / quantity, 2),
+        "best_system": candidates["name"].to_numpy()[best],
+        "solar_system_id": candidates["solar_system_id"].to_numpy()[best],
+        "jumps": candidates["jumps"].to_numpy()[best],
+        "cost_index": candidates["cost_index"].to_numpy()[best],
+        "Job_cost": np.round(costs[best, cols] / quantity, 2),
+        "home_job_cost": np.round(home_cost / quantity, 2),
+        "saving_per_unit": np.round((home_cost - costs[best, cols]) / quantity, 2),
+    })
+
+    per_system = candidates.copy()
+    per_system["total_job_cost"] = np.round(costs @ runs, 2)
+    per_system["products_won"] = np.bincount(best, minlength=len(candidates))
+    per_system = per_system.sort_values(by=["total_job_cost", "jumps"], kind="stable").reset_index(drop=True)
+
+    if output_csv is not None:
+        per_product.to_csv(output_csv, index=False)
+
+    return per_product, per_system
@@ -1,67 +1,119 @@
 import os
 import numpy as np
 import pandas as pd
-import json
 import matplotlib.pyplot as plt
-import requests
 import time
-from MMBANK.utils.bp_request import request_bpo_data_fuzzwork
-from MMBANK.prices.request_prices import request_hub_prices
+from MMBANK.analysis.rendering import check_render_mode, finish_figure, new_figure, render_many, write_plot_data
+from MMBANK.prices.request_prices import fetch_hub_prices
+from MMBANK.utils.bp_index import load_blueprint_index
+from MMBANK.utils.materials_imput import combine_input
 from MMBANK.utils.items_request import *
 
-TEMP_DIR = "MMBANK/temp"
-os.makedirs(TEMP_DIR, exist_ok=True)
 ANAL_DIR = "MMBANK/data/analysis"
 os.makedirs(ANAL_DIR, exist_ok=True)
 PLOTS_DIR = os.path.join(ANAL_DIR, "plots")
 
-
-def production_material_pie(name: str, ME_BPO: float = 0, ME_structure: float = 0, region_id: int = 10000002):
-    name_to_id = get_type_ids([name])
-    item_id = name_to_id.get(name)
-    if not item_id:
-        print(f"Error: {name} not found")
-        return
-
-    temp_items_csv = os.path.join(TEMP_DIR, "items.csv")
-    temp_bpo_csv = os.path.join(TEMP_DIR, "bpo_results.csv")
-    temp_prices_csv = os.path.join(TEMP_DIR, "prices.csv")
-
-    volume = get_type_volume(item_id)
-    pd.DataFrame([{"name": name, "item_id": item_id, "volume_m3": volume}]).to_csv(temp_items_csv, index=False)
-
-    request_bpo_data_fuzzwork(temp_items_csv, temp_bpo_csv, activity=1)
-
-    try:
-        bpo_df = pd.read_csv(temp_bpo_csv)
-        materials = json.loads(bpo_df.iloc[0]["materials"])
-    except (pd.errors.EmptyDataError, IndexError):
-        print(f"Error: No BPO data for {name}")
-        return
-
-    mat_list = [{"name": str(m["type_id"]), "item_id": m["type_id"], "volume_m3": 1} for m in materials]
-    pd.DataFrame(mat_list).to_csv(temp_prices_csv, index=False)
-    request_hub_prices(temp_prices_csv, temp_prices_csv, region_id=region_id)
-
-    prices_df = pd.read_csv(temp_prices_csv)
-    price_map = prices_df.set_index("item_id")["sellAvgFivePercent"].to_dict()
-
-    id_to_name = get_type_names([m["type_id"] for m in materials])
-
-    mat_costs = {}
-    for mat in materials:
-        m_id = mat["type_id"]
-        qty_eff = max(1, round(mat["quantity"] * (1 - ME_BPO) * (1 - ME_structure), 0))
-        cost = qty_eff * price_map.get(m_id, 0)
-        m_name = id_to_name.get(m_id, f"ID {m_id}")
-        mat_costs[m_name] = cost
-
-    _draw_and_save_pie(name, mat_costs)
-
-
-def _draw_and_save_pie(item_name, mat_costs):
+PIE_METHODS = ("Buy", "Sell", "Custom")
+
+
+def material_price_map(type_ids, method: str = "Sell", region_id: int = 10000002, custom_prices=None) -> dict:
+    if method not in PIE_METHODS:
+        raise ValueError(f"Unknown pricing method: {method}. Expected one of {PIE_METHODS}")
+
+    sources = []
+    if method != "Custom":
+        items = pd.DataFrame({"name": [str(t) for t in type_ids], "item_id": list(type_ids), "volume_m3": 1})
+        sources.append((fetch_hub_prices(items, region_id=region_id), method))
+    if custom_prices is not None:
+        sources.append((custom_prices, "Custom"))
+
+    if not sources:
+        raise ValueError("Custom pricing needs a custom_prices table")
+
+    prices = combine_input(sources)
+    return prices.set_index("item_id")["price"].to_dict()
+
+
+def material_breakdowns(
+        names,
+        ME_BPO: float = 0,
+        ME_structure: float = 0,
+        region_id: int = 10000002,
+        method: str = "Sell",
+        custom_prices=None,
+) -> dict:
+    name_to_id = get_type_ids(list(names))
+    index = load_blueprint_index()
+
+    recipes = {}
+    for name in names:
+        item_id = name_to_id.get(name)
+        if not item_id:
+            print(f"Error: {name} not found")
+            continue
+
+        bp_id = index.blueprint_for(int(item_id), 1)
+        if bp_id is None:
+            print(f"Error: No BPO data for {name}")
+            continue
+
+        mat_types, mat_qty = index.materials(bp_id, 1)
+        recipes[name] = list(zip(mat_types.tolist(), mat_qty.tolist()))
+
+    # Every lookup below runs once for the union of materials, however many items are requested.
+    all_materials = sorted({m_id for recipe in recipes.values() for m_id, _ in recipe})
+    if not all_materials:
+        return {}
+
+    price_map = material_price_map(all_materials, method, region_id=region_id, custom_prices=custom_prices)
+    id_to_name = get_type_names(all_materials)
+
+    breakdowns = {}
+    for name, recipe in recipes.items():
+        mat_costs = {}
+        for m_id, quantity in recipe:
+            qty_eff = max(1, round(quantity * (1 - ME_BPO) * (1 - ME_structure), 0))
+            cost = qty_eff * price_map.get(m_id, 0)
+            m_name = id_to_name.get(m_id, f"ID {m_id}")
+            mat_costs[m_name] = cost
+        breakdowns[name] = mat_costs
+
+    return breakdowns
+
+
+def production_material_pies(
+        names,
+        ME_BPO: float = 0,
+        ME_structure: float = 0,
+        region_id: int = 10000002,
+        method: str = "Sell",
+        custom_prices=None,
+        render: str = "save",
+        max_workers: int | None = None,
+) -> dict:
+    check_render_mode(render)
+    breakdowns = material_breakdowns(names, ME_BPO, ME_structure, region_id, method=method,
+                                     custom_prices=custom_prices)
+
+    jobs = [{"item_name": name, "mat_costs": mat_costs, "render": render} for name, mat_costs in breakdowns.items()]
+    if render == "save" and len(jobs) > 1:
+        paths = render_many(_draw_and_save_pie, jobs, max_workers=max_workers)
+    else:
+        paths = [_draw_and_save_pie(**job) for job in jobs]
+
+    return dict(zip(breakdowns, paths))
+
+
+def production_material_pie(name: str, ME_BPO: float = 0, ME_structure: float = 0, region_id: int = 10000002,
+                            render: str = "show", method: str = "Sell", custom_prices=None):
+    paths = production_material_pies([name], ME_BPO, ME_structure, region_id, method=method,
+                                     custom_prices=custom_prices, render=render)
+    return paths.get(name)
+
+
+def pie_slices(mat_costs):
     total = sum(mat_costs.values())
-    if total == 0: return
+    if total == 0: return [], [], 0
 
     sorted_costs = dict(sorted(mat_costs.items(), key=lambda x: x[1], reverse=True))
 
@@ -78,39 +130,51 @@ def _draw_and_save_pie(item_name, mat_costs):
         labels.append("Other Materials")
         sizes.append(other_sum)
 
+    return labels, sizes, total
+
+
+def _draw_and_save_pie(item_name, mat_costs, render: str = "show"):
+    labels, sizes, total = pie_slices(mat_costs)
+    if total == 0: return
+
+    safe_name = item_name.replace(" ", "_")
+    save_path = os.path.join(PLOTS_DIR, f"{safe_name}_prod_pie_{int(time.time())}.png")
+
+    if render == "data":
+        return write_plot_data({"item": item_name, "total": total, "materials": dict(zip(labels, sizes))}, save_path)
+
     num_elements = len(sizes)
     colors = plt.get_cmap('tab20')(np.linspace(0, 1, num_elements))
 
     if "Other Materials" in labels:
         colors[-1] = [0.6, 0.6, 0.6, 1.0]  # Grey
 
-    plt.style.use('ggplot')
-    fig, ax = plt.subplots(figsize=(12, 8))
+    with plt.style.context('ggplot'):
+        fig, ax = new_figure(render, figsize=(12, 8))
 
-    wedges, texts, autotexts = ax.pie(
-        sizes,
-        labels=None,
-        autopct='%1.1f%%',
-        startangle=140,
-        pctdistance=0.85,
-        textprops=dict(color="w", weight="bold", fontsize=10),
-        explode=[0.03] * len(sizes),
-        colors=colors
-    )
+        wedges, texts, autotexts = ax.pie(
+            sizes,
+            labels=None,
+            autopct='%1.1f%%',
+            startangle=140,
+            pctdistance=0.85,
+            textprops=dict(color="w", weight="bold", fontsize=10),
+            explode=[0.03] * len(sizes),
+            colors=colors
+        )
 
-    ax.add_artist(plt.Circle((0, 0), 0.70, fc='white'))
+        ax.add_artist(plt.Circle((0, 0), 0.70, fc='white'))
 
-    legend_labels = []
-    for i, l in enumerate(labels):
-        cost = sizes[i]
-        legend_labels.append(f'{l}: {cost:,.0f} ISK')
+        legend_labels = []
+        for i, l in enumerate(labels):
+            cost = sizes[i]
+            legend_labels.append(f'{l}: {cost:,.0f} ISK')
 
-    ax.legend(wedges, legend_labels, title="Materials & Cost", loc="center left", bbox_to_anchor=(0.9, 0, 0.5, 1))
+        ax.legend(wedges, legend_labels, title="Materials & Cost", loc="center left", bbox_to_anchor=(0.9, 0, 0.5, 1))
 
-    ax.set_title(f"Cost Distribution: {item_name}\nTotal: {total:,.2f} ISK", fontsize=16, pad=20)
+        ax.set_title(f"Cost Distribution: {item_name}\nTotal: {total:,.2f} ISK", fontsize=16, pad=20)
 
-    safe_name = item_name.replace(" ", "_")
-    save_path = os.path.join(PLOTS_DIR, f"{safe_name}_prod_pie_{int(time.time())}.png")
-    plt.tight_layout()
-    plt.savefig(save_path, dpi=150, bbox_inches='tight')
-    plt.show()
\ No newline at end of file
+        fig.tight_layout()
+        finish_figure(fig, save_path, 150, render=render)
+
+    return save_path
@@ -2,6 +2,10 @@ import os
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from MMBANK.analysis.rendering import check_render_mode, finish_figure, new_figure, write_plot_data
+from MMBANK.prices.order_book import MarketDepth
+from MMBANK.utils.materials_imput import as_frame
+
 
 ANAL_DIR = "MMBANK/data/analysis"
 os.makedirs(ANAL_DIR, exist_ok=True)
@@ -9,14 +13,18 @@ PLOTS_DIR = os.path.join(ANAL_DIR, "plots")
 
 
 def production_profit_analysis(
-        production_csv: str,
-        market_csv: str,
-        output_csv: str,
+        production_csv,
+        market_csv,
+        output_csv: str | None = None,
         top_n: int = 20,
-        plot_name: str = "profit_analysis_plot.png"
+        plot_name: str = "profit_analysis_plot.png",
+        depth: MarketDepth | None = None,
+        batch_size: int = 1,
+        render: str = "show"
 ):
-    prod_df = pd.read_csv(production_csv)
-    market_df = pd.read_csv(market_csv)
+    check_render_mode(render)
+    prod_df = as_frame(production_csv)
+    market_df = as_frame(market_csv)
 
     df = pd.merge(prod_df, market_df, on="item_id", how="inner", suffixes=('_prod', '_market'))
 
@@ -26,41 +34,57 @@ def production_profit_analysis(
     df["sell_margin_percent"] = (df["sell_profit_isk"] / df["Total_production_price"] * 100).fillna(0)
     df["buy_margin_percent"] = (df["buy_profit_isk"] / df["Total_production_price"] * 100).fillna(0)
 
+    if depth is not None:
+        df["batch_size"] = batch_size
+        df["buy_depth"] = depth.buy.depth(df["item_id"])
+        df["buy_fill_price"] = depth.buy.fill_price(df["item_id"], batch_size)
+        df["buy_fill_profit_isk"] = df["buy_fill_price"] - df["Total_production_price"].astype(float)
+        df["buy_fill_margin_percent"] = (df["buy_fill_profit_isk"] / df["Total_production_price"] * 100).fillna(0)
+
     df_sorted = df.sort_values(by="sell_margin_percent", ascending=False)
-    df_sorted.to_csv(output_csv, index=False)
+    if output_csv is not None:
+        df_sorted.to_csv(output_csv, index=False)
     top_df = df_sorted.head(top_n)
 
-    plt.style.use('seaborn-v0_8-muted')
-    fig, axes = plt.subplots(2, 2, figsize=(20, 14))
-    fig.suptitle(f"Profit Analysis: {plot_name} (Top {top_n} by ISK Profit)", fontsize=20,
-                 fontweight='bold')
+    plot_path = os.path.join(PLOTS_DIR, plot_name)
+    if render == "data":
+        write_plot_data(top_df, plot_path)
+    else:
+        plot_profit_analysis(top_df, plot_name, top_n, plot_path, render=render)
 
-    def style_axis(ax, title, ylabel, color_theme='viridis'):
-        ax.set_title(title, fontsize=14, pad=15)
-        ax.set_ylabel(ylabel, fontsize=12)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        ax.tick_params(axis='x', rotation=45, labelsize=10)
+    print("\nTop products by absolute sell profit:")
+    print(top_df[["name_prod", "Total_production_price", "sell_profit_isk", "sell_margin_percent"]].to_string(
+        index=False))
 
-    top_df.plot(x="name_prod", y="sell_profit_isk", kind="bar", ax=axes[0, 0], color='seagreen', legend=False)
-    style_axis(axes[0, 0], "Absolute Sell Profit (ISK per unit)", "ISK")
+    return df_sorted
 
-    top_df.plot(x="name_prod", y="buy_profit_isk", kind="bar", ax=axes[0, 1], color='steelblue', legend=False)
-    style_axis(axes[0, 1], "Absolute Buy Profit (ISK per unit)", "ISK")
 
-    top_df.plot(x="name_prod", y="sell_margin_percent", kind="bar", ax=axes[1, 0], color='mediumseagreen', legend=False)
-    style_axis(axes[1, 0], "Sell Margin %", "Percent (%)")
+def plot_profit_analysis(top_df: pd.DataFrame, plot_name: str, top_n: int, plot_path: str, dpi: int = 300,
+                         render: str = "show"):
+    with plt.style.context('seaborn-v0_8-muted'):
+        fig, axes = new_figure(render, 2, 2, figsize=(20, 14))
+        fig.suptitle(f"Profit Analysis: {plot_name} (Top {top_n} by ISK Profit)", fontsize=20,
+                     fontweight='bold')
 
-    top_df.plot(x="name_prod", y="buy_margin_percent", kind="bar", ax=axes[1, 1], color='dodgerblue', legend=False)
-    style_axis(axes[1, 1], "Buy Margin %", "Percent (%)")
+        def style_axis(ax, title, ylabel, color_theme='viridis'):
+            ax.set_title(title, fontsize=14, pad=15)
+            ax.set_ylabel(ylabel, fontsize=12)
+            ax.grid(axis='y', linestyle='--', alpha=0.7)
+            ax.tick_params(axis='x', rotation=45, labelsize=10)
 
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+        top_df.plot(x="name_prod", y="sell_profit_isk", kind="bar", ax=axes[0, 0], color='seagreen', legend=False)
+        style_axis(axes[0, 0], "Absolute Sell Profit (ISK per unit)", "ISK")
 
-    plot_path = os.path.join(PLOTS_DIR, plot_name)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    print(f"Plot saved to: {plot_path}")
+        top_df.plot(x="name_prod", y="buy_profit_isk", kind="bar", ax=axes[0, 1], color='steelblue', legend=False)
+        style_axis(axes[0, 1], "Absolute Buy Profit (ISK per unit)", "ISK")
 
-    plt.show()
+        top_df.plot(x="name_prod", y="sell_margin_percent", kind="bar", ax=axes[1, 0], color='mediumseagreen',
+                    legend=False)
+        style_axis(axes[1, 0], "Sell Margin %", "Percent (%)")
 
-    print("\nTop products by absolute sell profit:")
-    print(top_df[["name_prod", "Total_production_price", "sell_profit_isk", "sell_margin_percent"]].to_string(
-        index=False))
+        top_df.plot(x="name_prod", y="buy_margin_percent", kind="bar", ax=axes[1, 1], color='dodgerblue',
+                    legend=False)
+        style_axis(axes[1, 1], "Buy Margin %", "Percent (%)")
+
+        fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+        finish_figure(fig, plot_path, dpi, render=render)
@@ -0,0 +1,67 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import pandas as pd
+from matplotlib.figure import Figure
+
+RENDER_MODES = ("show", "save", "data")
+
+
+def use_batch_backend():
+    matplotlib.use("Agg", force=True)
+
+
+def check_render_mode(render: str):
+    if render not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode: {render}. Expected one of {RENDER_MODES}")
+
+
+def new_figure(render: str = "show", nrows: int = 1, ncols: int = 1, **fig_kw):
+    # Only "show" goes through pyplot; saved figures are built detached from it, so they
+    # never touch the interactive backend and can be drawn from worker threads.
+    if render == "show":
+        import matplotlib.pyplot as plt
+        return plt.subplots(nrows, ncols, **fig_kw)
+
+    fig = Figure(**fig_kw)
+    return fig, fig.subplots(nrows, ncols)
+
+
+def finish_figure(fig, path: str, dpi: int, render: str = "show"):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    print(f"Plot saved to: {path}")
+
+    if render == "show":
+        import matplotlib.pyplot as plt
+        plt.show()
+        plt.close(fig)
+
+
+def write_plot_data(data, path: str) -> str:
+    root, _ = os.path.splitext(path)
+    os.makedirs(os.path.dirname(root) or ".", exist_ok=True)
+
+    if isinstance(data, pd.DataFrame):
+        out_path = f"{root}.csv"
+        data.to_csv(out_path, index=False)
+    else:
+        out_path = f"{root}.json"
+        with open(out_path, "w") as f:
+            json.dump(data, f, indent=2, default=float)
+
+    print(f"Plot data saved to: {out_path}")
+    return out_path
+
+
+def _render_job(func, kwargs):
+    return func(**kwargs)
+
+
+def render_many(func, jobs: list, max_workers: int | None = None) -> list:
+    # Workers start on Agg so no job can open a GUI window; func must be a module-level function.
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=use_batch_backend) as pool:
+        futures = [pool.submit(_render_job, func, kwargs) for kwargs in jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from MMBANK.utils.materials_imput import as_frame
+
+
+TIME_DEFAULTS = {
+    "TE_BPO": 0,
+    "TE_structure": 0,
+    "TE_skills": 0,
+    "TE_implant": 0,
+}
+
+
+def job_durations(base_time, runs=1, TE_BPO=0, TE_structure=0, TE_skills=0, TE_implant=0) -> np.ndarray:
+    base_time = np.asarray(base_time, dtype=np.float64)
+    multiplier = (1 - TE_BPO) * (1 - TE_structure) * (1 - TE_skills) * (1 - TE_implant)
+    return base_time * multiplier * np.asarray(runs, dtype=np.float64)
+
+
+def throughput_analysis(
+        profit_df,
+        bpo_csv,
+        profit_column: str = "sell_profit_isk",
+        output_csv: str | None = None,
+        **time_params
+) -> pd.DataFrame:
+    unknown = set(time_params) - set(TIME_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown time parameters: {sorted(unknown)}")
+    params = {**TIME_DEFAULTS, **time_params}
+
+    df = as_frame(profit_df)
+    bpo = as_frame(bpo_csv)[["item_id", "volume_m3", "base_time", "quantity"]]
+
+    df = df.drop(columns=["base_time", "quantity"], errors="ignore").merge(
+        bpo, on="item_id", how="inner", suffixes=("", "_bpo")
+    )
+    if "volume_m3_bpo" in df.columns:
+        df["volume_m3"] = df["volume_m3"].fillna(df["volume_m3_bpo"])
+        df = df.drop(columns=["volume_m3_bpo"])
+
+    profit = df[profit_column].astype(float).to_numpy()
+    quantity = df["quantity"].astype(float).to_numpy()
+    volume = df["volume_m3"].astype(float).to_numpy()
+
+    job_seconds = job_durations(df["base_time"], **params)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units_per_hour = np.where(job_seconds > 0, quantity * 3600 / job_seconds, np.nan)
+        isk_per_m3 = np.where(volume > 0, profit / volume, np.nan)
+
+    df["job_seconds"] = job_seconds
+    df["units_per_hour"] = units_per_hour
+    df["isk_per_hour"] = profit * units_per_hour
+    df["isk_per_m3"] = isk_per_m3
+
+    df = df.sort_values(by="isk_per_hour", ascending=False, na_position="last")
+    if output_csv is not None:
+        df.to_csv(output_csv, index=False)
+
+    return df
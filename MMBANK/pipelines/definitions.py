@@ -0,0 +1,171 @@
+from MMBANK.analysis.profit_analysis import production_profit_analysis
+from MMBANK.pipelines.production_profit import JITA_REGION_ID, REACTION_FACILITY, T2_COMP_FACILITY
+from MMBANK.pipelines.runner import Pipeline, Stage
+from MMBANK.prices.request_prices import add_adjusted_prices, request_hub_prices
+from MMBANK.reactions.reaction_production import calculate_production
+from MMBANK.utils.materials_imput import combine_input
+
+
+MARKET_TTL = 300
+
+
+def combine_prices(sources: list, output_path: str, methods: list, adjusted: bool = False):
+    df = combine_input(list(zip(sources, methods)))
+
+    if adjusted:
+        adjusted_df = add_adjusted_prices(df)
+        if adjusted_df is not None:
+            df = adjusted_df
+
+    df.to_csv(output_path, index=False)
+
+
+def market_stage(name: str, items_csv: str, market_csv: str) -> Stage:
+    return Stage(
+        name,
+        request_hub_prices,
+        inputs={"input_csv_path": items_csv},
+        outputs={"output_csv_path": market_csv},
+        params={"region_id": JITA_REGION_ID, "snapshot": True},
+        ttl=MARKET_TTL,
+    )
+
+
+def prices_stage(name: str, materials: dict, output_path: str, adjusted: bool) -> Stage:
+    return Stage(
+        name,
+        combine_prices,
+        inputs={"sources": list(materials)},
+        outputs={"output_path": output_path},
+        params={"methods": list(materials.values()), "adjusted": adjusted},
+        ttl=MARKET_TTL if adjusted else None,
+    )
+
+
+def production_stage(name: str, bpo_csv: str, prices_csv: str, output_csv: str, facility: dict) -> Stage:
+    return Stage(
+        name,
+        calculate_production,
+        inputs={"input_path": bpo_csv, "prices_path": prices_csv},
+        outputs={"output_path": output_csv},
+        params=facility,
+    )
+
+
+def analysis_stage(name: str, production_csv: str, market_csv: str, output_csv: str, plot_name: str) -> Stage:
+    return Stage(
+        name,
+        production_profit_analysis,
+        inputs={"production_csv": production_csv, "market_csv": market_csv},
+        outputs={"output_csv": output_csv},
+        params={"top_n": 10, "plot_name": plot_name, "render": "save"},
+    )
+
+
+def reaction_chain_stages() -> list:
+    return [
+        market_stage(
+            "market_moon_materials",
+            "MMBANK/data/items/moon_materials.csv",
+            "MMBANK/data/market/jita_moon_materials.csv",
+        ),
+        prices_stage(
+            "prices_T1",
+            {
+                "MMBANK/data/market/jita_moon_materials.csv": "Buy",
+                "MMBANK/data/market/fuel_custom_prices.csv": "Custom",
+            },
+            "MMBANK/data/industry/all_prices_T1.csv",
+            adjusted=True,
+        ),
+        production_stage(
+            "production_comp_1",
+            "MMBANK/data/BPO/reactions_comp_1_bpo.csv",
+            "MMBANK/data/industry/all_prices_T1.csv",
+            "MMBANK/data/industry/production_costs_comp_1.csv",
+            REACTION_FACILITY,
+        ),
+        prices_stage(
+            "prices_T2",
+            {
+                "MMBANK/data/industry/production_costs_comp_1.csv": "Production",
+                "MMBANK/data/market/fuel_custom_prices.csv": "Custom",
+            },
+            "MMBANK/data/industry/all_prices_T2.csv",
+            adjusted=False,
+        ),
+        production_stage(
+            "production_comp_2",
+            "MMBANK/data/BPO/reactions_comp_2_bpo.csv",
+            "MMBANK/data/industry/all_prices_T2.csv",
+            "MMBANK/data/industry/production_costs_comp_2.csv",
+            REACTION_FACILITY,
+        ),
+    ]
+
+
+def t2_react_pipeline() -> Pipeline:
+    return Pipeline("T2_react_full_cycle", reaction_chain_stages() + [
+        market_stage(
+            "market_reactions_comp_2",
+            "MMBANK/data/items/reactions_comp_2.csv",
+            "MMBANK/data/market/jita_reactions_comp_2.csv",
+        ),
+        analysis_stage(
+            "analysis",
+            "MMBANK/data/industry/production_costs_comp_2.csv",
+            "MMBANK/data/market/jita_reactions_comp_2.csv",
+            "MMBANK/data/analysis/summary/profit_analysis_T2_reactions_full_cycle.csv",
+            "T2_reactions_full_cycle",
+        ),
+    ])
+
+
+def t2_comp_pipeline(method: str) -> Pipeline:
+    stages = [
+        market_stage(
+            "market_t2_comp",
+            "MMBANK/data/items/t2_comp.csv",
+            "MMBANK/data/market/jita_t2_comp.csv",
+        ),
+    ]
+
+    if method == "Buy" or method == "Sell":
+        stages.append(market_stage(
+            "market_reactions_comp_2",
+            "MMBANK/data/items/reactions_comp_2.csv",
+            "MMBANK/data/market/jita_reactions_comp_2.csv",
+        ))
+        materials = {"MMBANK/data/market/jita_reactions_comp_2.csv": method}
+
+    elif method == "Full":
+        stages += reaction_chain_stages()
+        materials = {"MMBANK/data/industry/production_costs_comp_2.csv": "Production"}
+
+    else:
+        raise Exception("Invalid method")
+
+    stages += [
+        prices_stage(
+            "prices_comp_T2",
+            materials,
+            "MMBANK/data/industry/all_prices_comp_T2.csv",
+            adjusted=True,
+        ),
+        production_stage(
+            "production_T2_comp",
+            "MMBANK/data/BPO/t2_comp_bpo.csv",
+            "MMBANK/data/industry/all_prices_comp_T2.csv",
+            "MMBANK/data/industry/production_costs_T2_comp.csv",
+            T2_COMP_FACILITY,
+        ),
+        analysis_stage(
+            "analysis",
+            "MMBANK/data/industry/production_costs_T2_comp.csv",
+            "MMBANK/data/market/jita_t2_comp.csv",
+            "MMBANK/data/analysis/summary/profit_analysis_T2_comp.csv",
+            f"T2_comp_production_method_{method}",
+        ),
+    ]
+
+    return Pipeline(f"T2_comp_full_cycle_{method}", stages)
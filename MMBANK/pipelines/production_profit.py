@@ -1,203 +1,378 @@
 from pandas.core.groupby.base import plotting_methods
+import pandas as pd
 
-from MMBANK.prices.request_prices import request_hub_prices
+from MMBANK.prices.request_prices import fetch_hub_prices
+from MMBANK.prices.order_book import JITA_4_4, fetch_market_depth
+from MMBANK.prices.multi_hub import fetch_hub_matrix
+from MMBANK.storage.timeseries import append_snapshot
+from MMBANK.utils.jump_graph import hub_haul_rates
 from MMBANK.utils.materials_imput import combine_input
-from MMBANK.prices.request_prices import update_csv_with_adjusted_prices
+from MMBANK.prices.request_prices import add_adjusted_prices, get_adjusted_prices
 from MMBANK.reactions.reaction_production import calculate_production
+from MMBANK.reactions.build_tree import BuildTree
 from MMBANK.analysis.profit_analysis import production_profit_analysis
+from MMBANK.analysis.throughput import throughput_analysis
+from MMBANK.analysis.capacity import plan_production
+from MMBANK.analysis.facility import cheapest_facilities, system_cost_index
 
 
-def T2_react_full_cycle_profit():
-    request_hub_prices(
-        input_csv_path="MMBANK/data/items/moon_materials.csv",
-        output_csv_path="MMBANK/data/market/jita_moon_materials.csv",
-        region_id=10000002
-    )
-    request_hub_prices(
-        input_csv_path="MMBANK/data/items/reactions_comp_1.csv",
-        output_csv_path="MMBANK/data/market/jita_reactions_comp_1.csv",
-        region_id=10000002
-    )
-    request_hub_prices(
-        input_csv_path="MMBANK/data/items/reactions_comp_2.csv",
-        output_csv_path="MMBANK/data/market/jita_reactions_comp_2.csv",
-        region_id=10000002
-    )
+JITA_REGION_ID = 10000002
 
-    materials = {
-        "MMBANK/data/market/jita_moon_materials.csv": "Buy",
-        "MMBANK/data/market/fuel_custom_prices.csv": "Custom"
-    }
+REACTION_FACILITY = {
+    "ME_structure": 0.026,
+    "ME_BPO": 0,
+    "system_cost_index": 0.0493,
+    "facility_tax": 0.02,
+    "structure_discount": 0,
+    "activity_id": 11,
+}
 
-    output_path = "MMBANK/data/industry/all_prices_T1.csv"
-    combine_input(materials, output_path)
+T2_COMP_FACILITY = {
+    "ME_structure": 0.06,
+    "ME_BPO": 0.1,
+    "system_cost_index": 0.0245,
+    "facility_tax": 0.01,
+    "structure_discount": 0.03,
+    "activity_id": 1,
+}
 
-    update_csv_with_adjusted_prices('MMBANK/data/industry/all_prices_T1.csv')
 
-    calculate_production(
-        input_path="MMBANK/data/BPO/reactions_comp_1_bpo.csv",
-        prices_path="MMBANK/data/industry/all_prices_T1.csv",
-        output_path="MMBANK/data/industry/production_costs_comp_1.csv",
-        ME_structure=0.026,
-        ME_BPO=0,
-        system_cost_index=0.0493,
-        facility_tax=0.02,
-        structure_discount=0,
-        activity_id=11
+def _checkpoint(path: str, checkpoint: bool) -> str | None:
+    return path if checkpoint else None
+
+
+def _facility(facility: dict, system, cost_indices=None) -> dict:
+    # The constants above are fallbacks; a named system swaps in its live cost index for the facility's activity.
+    if system is None:
+        return facility
+
+    index = system_cost_index(system, facility["activity_id"], cost_indices)
+    if index is None:
+        print(f"Warning: no cost index for {system}, using {facility['system_cost_index']}")
+        return facility
+
+    return {**facility, "system_cost_index": index}
+
+
+def _hub_prices(items_csv: str, market_csv: str, checkpoint: bool) -> pd.DataFrame:
+    df = fetch_hub_prices(pd.read_csv(items_csv), region_id=JITA_REGION_ID)
+
+    if checkpoint:
+        df.to_csv(market_csv, index=False)
+        append_snapshot(df, JITA_REGION_ID)
+
+    return df
+
+
+def _with_adjusted_prices(df: pd.DataFrame, output_path: str, checkpoint: bool) -> pd.DataFrame:
+    adjusted = add_adjusted_prices(df)
+    if adjusted is not None:
+        df = adjusted
+
+    if checkpoint:
+        df.to_csv(output_path, index=False)
+
+    return df
+
+
+def _reaction_chain(moon_market: pd.DataFrame, checkpoint: bool, reaction_system=None) -> pd.DataFrame:
+    reaction_facility = _facility(REACTION_FACILITY, reaction_system)
+
+    materials = [
+        (moon_market, "Buy"),
+        ("MMBANK/data/market/fuel_custom_prices.csv", "Custom"),
+    ]
+
+    prices_T1 = _with_adjusted_prices(
+        combine_input(materials),
+        "MMBANK/data/industry/all_prices_T1.csv",
+        checkpoint
     )
 
+    costs_comp_1 = calculate_production(
+        input_path="MMBANK/data/BPO/reactions_comp_1_bpo.csv",
+        prices_path=prices_T1,
+        output_path=_checkpoint("MMBANK/data/industry/production_costs_comp_1.csv", checkpoint),
+        **reaction_facility
+    )
 
-    materials = {
-        "MMBANK/data/industry/production_costs_comp_1.csv": "Production",
-        "MMBANK/data/market/fuel_custom_prices.csv": "Custom"
-    }
+    materials = [
+        (costs_comp_1, "Production"),
+        ("MMBANK/data/market/fuel_custom_prices.csv", "Custom"),
+    ]
 
-    output_path = "MMBANK/data/industry/all_prices_T2.csv"
-    combine_input(materials, output_path)
+    prices_T2 = combine_input(materials, _checkpoint("MMBANK/data/industry/all_prices_T2.csv", checkpoint))
 
-    calculate_production(
+    return calculate_production(
         input_path="MMBANK/data/BPO/reactions_comp_2_bpo.csv",
-        prices_path="MMBANK/data/industry/all_prices_T2.csv",
-        output_path="MMBANK/data/industry/production_costs_comp_2.csv",
-        ME_structure=0.026,
-        ME_BPO=0,
-        system_cost_index=0.0493,
-        facility_tax=0.02,
-        structure_discount=0,
-        activity_id=11
-    )
-
-    production_profit_analysis(
-        production_csv="MMBANK/data/industry/production_costs_comp_2.csv",
-        market_csv="MMBANK/data/market/jita_reactions_comp_2.csv",
-        output_csv="MMBANK/data/analysis/summary/profit_analysis_T2_reactions_full_cycle.csv",
+        prices_path=prices_T2,
+        output_path=_checkpoint("MMBANK/data/industry/production_costs_comp_2.csv", checkpoint),
+        **reaction_facility
+    )
+
+
+def T2_react_full_cycle_profit(checkpoint: bool = False, render: str = "show", reaction_system=None) -> pd.DataFrame:
+    moon_market = _hub_prices(
+        "MMBANK/data/items/moon_materials.csv",
+        "MMBANK/data/market/jita_moon_materials.csv",
+        checkpoint
+    )
+    if checkpoint:
+        # Only written out for the market CSV; the chain prices comp 1 from its own production cost.
+        _hub_prices(
+            "MMBANK/data/items/reactions_comp_1.csv",
+            "MMBANK/data/market/jita_reactions_comp_1.csv",
+            checkpoint
+        )
+    comp_2_market = _hub_prices(
+        "MMBANK/data/items/reactions_comp_2.csv",
+        "MMBANK/data/market/jita_reactions_comp_2.csv",
+        checkpoint
+    )
+
+    costs_comp_2 = _reaction_chain(moon_market, checkpoint, reaction_system)
+
+    return production_profit_analysis(
+        production_csv=costs_comp_2,
+        market_csv=comp_2_market,
+        output_csv=_checkpoint("MMBANK/data/analysis/summary/profit_analysis_T2_reactions_full_cycle.csv", checkpoint),
         top_n=10,
-        plot_name="T2_reactions_full_cycle"
+        plot_name="T2_reactions_full_cycle",
+        render=render
     )
 
 
-def T2_comp_full_cycle_profit(method: str):
+def T2_comp_full_cycle_profit(
+        method: str,
+        checkpoint: bool = False,
+        batch_size: int | None = None,
+        render: str = "show",
+        facility_system=None,
+        reaction_system=None
+) -> pd.DataFrame:
 
-    request_hub_prices(
-        input_csv_path="MMBANK/data/items/t2_comp.csv",
-        output_csv_path="MMBANK/data/market/jita_t2_comp.csv",
-        region_id=10000002
+    t2_market = _hub_prices(
+        "MMBANK/data/items/t2_comp.csv",
+        "MMBANK/data/market/jita_t2_comp.csv",
+        checkpoint
     )
 
-    request_hub_prices(
-        input_csv_path="MMBANK/data/items/reactions_comp_2.csv",
-        output_csv_path="MMBANK/data/market/jita_reactions_comp_2.csv",
-        region_id=10000002
+    comp_2_market = _hub_prices(
+        "MMBANK/data/items/reactions_comp_2.csv",
+        "MMBANK/data/market/jita_reactions_comp_2.csv",
+        checkpoint
     )
 
     if method == "Buy" or method == "Sell":
-        if method == "Buy":
 
-            materials = {
-                "MMBANK/data/market/jita_reactions_comp_2.csv": "Buy",
-            }
+        materials = [
+            (comp_2_market, method),
+        ]
 
-            output_path = "MMBANK/data/industry/all_prices_comp_T2.csv"
-            combine_input(materials, output_path)
+    elif method == "Full":
 
-            update_csv_with_adjusted_prices('MMBANK/data/industry/all_prices_comp_T2.csv')
+        moon_market = _hub_prices(
+            "MMBANK/data/items/moon_materials.csv",
+            "MMBANK/data/market/jita_moon_materials.csv",
+            checkpoint
+        )
+        if checkpoint:
+            _hub_prices(
+                "MMBANK/data/items/reactions_comp_1.csv",
+                "MMBANK/data/market/jita_reactions_comp_1.csv",
+                checkpoint
+            )
 
-        elif method == "Sell":
+        materials = [
+            (_reaction_chain(moon_market, checkpoint, reaction_system), "Production"),
+        ]
 
-            materials = {
-                "MMBANK/data/market/jita_reactions_comp_2.csv": "Sell",
-            }
+    else:
+        raise Exception("Invalid method")
 
-            output_path = "MMBANK/data/industry/all_prices_comp_T2.csv"
-            combine_input(materials, output_path)
+    prices_comp_T2 = _with_adjusted_prices(
+        combine_input(materials),
+        "MMBANK/data/industry/all_prices_comp_T2.csv",
+        checkpoint
+    )
 
-            update_csv_with_adjusted_prices('MMBANK/data/industry/all_prices_comp_T2.csv')
+    costs_T2_comp = calculate_production(
+        input_path="MMBANK/data/BPO/t2_comp_bpo.csv",
+        prices_path=prices_comp_T2,
+        output_path=_checkpoint("MMBANK/data/industry/production_costs_T2_comp.csv", checkpoint),
+        **_facility(T2_COMP_FACILITY, facility_system)
+    )
 
-    elif method == "Full":
+    plot_method_name = f"T2_comp_production_method_{method}"
+    depth = fetch_market_depth(t2_market["item_id"], JITA_REGION_ID, location_id=JITA_4_4) if batch_size else None
 
-        request_hub_prices(
-            input_csv_path="MMBANK/data/items/moon_materials.csv",
-            output_csv_path="MMBANK/data/market/jita_moon_materials.csv",
-            region_id=10000002
-        )
-        request_hub_prices(
-            input_csv_path="MMBANK/data/items/reactions_comp_1.csv",
-            output_csv_path="MMBANK/data/market/jita_reactions_comp_1.csv",
-            region_id=10000002
-        )
+    return production_profit_analysis(
+        production_csv=costs_T2_comp,
+        market_csv=t2_market,
+        output_csv=_checkpoint("MMBANK/data/analysis/summary/profit_analysis_T2_comp.csv", checkpoint),
+        top_n=10,
+        plot_name=plot_method_name,
+        depth=depth,
+        batch_size=batch_size or 1,
+        render=render
+    )
 
-        materials = {
-            "MMBANK/data/market/jita_moon_materials.csv": "Buy",
-            "MMBANK/data/market/fuel_custom_prices.csv": "Custom"
-        }
-
-        output_path = "MMBANK/data/industry/all_prices_T1.csv"
-        combine_input(materials, output_path)
-
-        update_csv_with_adjusted_prices('MMBANK/data/industry/all_prices_T1.csv')
-
-        calculate_production(
-            input_path="MMBANK/data/BPO/reactions_comp_1_bpo.csv",
-            prices_path="MMBANK/data/industry/all_prices_T1.csv",
-            output_path="MMBANK/data/industry/production_costs_comp_1.csv",
-            ME_structure=0.026,
-            ME_BPO=0,
-            system_cost_index=0.0493,
-            facility_tax=0.02,
-            structure_discount=0,
-            activity_id=11
-        )
 
-        materials = {
-            "MMBANK/data/industry/production_costs_comp_1.csv": "Production",
-            "MMBANK/data/market/fuel_custom_prices.csv": "Custom"
-        }
-
-        output_path = "MMBANK/data/industry/all_prices_T2.csv"
-        combine_input(materials, output_path)
-
-        calculate_production(
-            input_path="MMBANK/data/BPO/reactions_comp_2_bpo.csv",
-            prices_path="MMBANK/data/industry/all_prices_T2.csv",
-            output_path="MMBANK/data/industry/production_costs_comp_2.csv",
-            ME_structure=0.026,
-            ME_BPO=0,
-            system_cost_index=0.0493,
-            facility_tax=0.02,
-            structure_discount=0,
-            activity_id=11
-        )
+def T2_comp_multi_hub_profit(
+        method: str,
+        haul_rate=None,
+        home: str = "Jita",
+        checkpoint: bool = False,
+        render: str = "show",
+        isk_per_m3_jump: float | None = None
+) -> pd.DataFrame:
+    if method != "Buy" and method != "Sell":
+        raise Exception("Invalid method")
+    if haul_rate is None:
+        if isk_per_m3_jump is None:
+            raise ValueError("Either haul_rate or isk_per_m3_jump is required")
+        haul_rate = hub_haul_rates(home, isk_per_m3_jump)
+
+    t2_hubs = fetch_hub_matrix(
+        pd.read_csv("MMBANK/data/items/t2_comp.csv"),
+        output_csv=_checkpoint("MMBANK/data/market/hubs_t2_comp.csv", checkpoint)
+    )
+    comp_2_hubs = fetch_hub_matrix(
+        pd.read_csv("MMBANK/data/items/reactions_comp_2.csv"),
+        output_csv=_checkpoint("MMBANK/data/market/hubs_reactions_comp_2.csv", checkpoint)
+    )
 
-        materials = {
-            "MMBANK/data/industry/production_costs_comp_2.csv": "Production",
-        }
+    materials = [
+        (comp_2_hubs.market_frame(home, haul_rate, "input"), method),
+    ]
 
-        output_path = "MMBANK/data/industry/all_prices_comp_T2.csv"
-        combine_input(materials, output_path)
+    prices = _with_adjusted_prices(
+        combine_input(materials),
+        "MMBANK/data/industry/all_prices_comp_T2_multi_hub.csv",
+        checkpoint
+    )
 
-        update_csv_with_adjusted_prices('MMBANK/data/industry/all_prices_comp_T2.csv')
+    costs = calculate_production(
+        input_path="MMBANK/data/BPO/t2_comp_bpo.csv",
+        prices_path=prices,
+        output_path=_checkpoint("MMBANK/data/industry/production_costs_T2_comp_multi_hub.csv", checkpoint),
+        **T2_COMP_FACILITY
+    )
 
-    else:
+    return production_profit_analysis(
+        production_csv=costs,
+        market_csv=t2_hubs.market_frame(home, haul_rate, "output"),
+        output_csv=_checkpoint("MMBANK/data/analysis/summary/profit_analysis_T2_comp_multi_hub.csv", checkpoint),
+        top_n=10,
+        plot_name=f"T2_comp_multi_hub_{method}",
+        render=render
+    )
+
+
+def T2_comp_build_tree_costs(
+        output_csv: str = "MMBANK/data/industry/build_tree_T2_comp.csv",
+        checkpoint: bool = False
+) -> pd.DataFrame:
+    moon_market = _hub_prices(
+        "MMBANK/data/items/moon_materials.csv",
+        "MMBANK/data/market/jita_moon_materials.csv",
+        checkpoint
+    )
+
+    materials = [
+        (moon_market, "Buy"),
+        ("MMBANK/data/market/fuel_custom_prices.csv", "Custom"),
+    ]
+
+    prices = combine_input(materials, _checkpoint("MMBANK/data/industry/all_prices_T1.csv", checkpoint))
+    adjusted = {item["type_id"]: item.get("adjusted_price", 0) for item in get_adjusted_prices() or []}
+
+    tree = BuildTree(
+        prices,
+        facilities={11: REACTION_FACILITY, 1: T2_COMP_FACILITY},
+        adjusted_prices=adjusted,
+    )
+
+    items = pd.read_csv("MMBANK/data/items/t2_comp.csv")
+    costs = tree.cost(items["item_id"])
+    costs.insert(0, "name", items["name"].to_numpy())
+    if checkpoint:
+        costs.to_csv(output_csv, index=False)
+
+    return costs
+
+
+def T2_comp_throughput(
+        method: str,
+        checkpoint: bool = False,
+        render: str = "save",
+        profit_column: str = "sell_profit_isk",
+        **time_params
+) -> pd.DataFrame:
+    profit = T2_comp_full_cycle_profit(method, checkpoint=checkpoint, render=render)
+
+    return throughput_analysis(
+        profit,
+        "MMBANK/data/BPO/t2_comp_bpo.csv",
+        profit_column=profit_column,
+        output_csv=_checkpoint("MMBANK/data/analysis/summary/throughput_T2_comp.csv", checkpoint),
+        **time_params
+    )
+
+
+def T2_comp_production_plan(
+        method: str,
+        lines: int,
+        horizon_hours: float,
+        budget: float,
+        absorption: float = 0.1,
+        checkpoint: bool = False,
+        **time_params
+) -> pd.DataFrame:
+    throughput = T2_comp_throughput(method, checkpoint=checkpoint, **time_params)
+
+    return plan_production(
+        throughput,
+        lines=lines,
+        horizon_hours=horizon_hours,
+        budget=budget,
+        absorption=absorption,
+        output_csv=_checkpoint("MMBANK/data/analysis/summary/production_plan_T2_comp.csv", checkpoint),
+    )
+
+
+def T2_comp_facility_scan(
+        method: str,
+        home="Jita",
+        max_jumps: int = 5,
+        highsec_only: bool = True,
+        cost_indices=None,
+        checkpoint: bool = False
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    if method != "Buy" and method != "Sell":
         raise Exception("Invalid method")
 
-    calculate_production(
-        input_path="MMBANK/data/BPO/t2_comp_bpo.csv",
-        prices_path="MMBANK/data/industry/all_prices_comp_T2.csv",
-        output_path="MMBANK/data/industry/production_costs_T2_comp.csv",
-        ME_structure=0.06,
-        ME_BPO=0.1,
-        system_cost_index=0.0245,
-        facility_tax=0.01,
-        structure_discount=0.03,
-        activity_id=1
+    comp_2_market = _hub_prices(
+        "MMBANK/data/items/reactions_comp_2.csv",
+        "MMBANK/data/market/jita_reactions_comp_2.csv",
+        checkpoint
     )
 
-    plot_method_name = f"T2_comp_production_method_{method}"
+    prices = _with_adjusted_prices(
+        combine_input([(comp_2_market, method)]),
+        "MMBANK/data/industry/all_prices_comp_T2_facility_scan.csv",
+        checkpoint
+    )
 
-    production_profit_analysis(
-        production_csv="MMBANK/data/industry/production_costs_T2_comp.csv",
-        market_csv="MMBANK/data/market/jita_t2_comp.csv",
-        output_csv="MMBANK/data/analysis/summary/profit_analysis_T2_comp.csv",
-        top_n=10,
-        plot_name=plot_method_name
-    )
\ No newline at end of file
+    return cheapest_facilities(
+        "MMBANK/data/BPO/t2_comp_bpo.csv",
+        prices,
+        home=home,
+        max_jumps=max_jumps,
+        cost_indices=cost_indices,
+        activity_id=T2_COMP_FACILITY["activity_id"],
+        highsec_only=highsec_only,
+        structure_discount=T2_COMP_FACILITY["structure_discount"],
+        facility_tax=T2_COMP_FACILITY["facility_tax"],
+        output_csv=_checkpoint("MMBANK/data/analysis/summary/facility_scan_T2_comp.csv", checkpoint),
+    )
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from MMBANK.utils.response_cache import CACHE_DIR
+
+
+STATE_PATH = os.path.join(CACHE_DIR, "pipeline_state.json")
+
+
+def _paths(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [p for v in value for p in _paths(v)]
+    return [value]
+
+
+def _file_hash(path: str) -> str:
+    if not os.path.exists(path):
+        return "missing"
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Stage:
+    def __init__(self, name, func, inputs=None, outputs=None, params=None, ttl=None):
+        self.name = name
+        self.func = func
+        self.inputs = dict(inputs or {})
+        self.outputs = dict(outputs or {})
+        self.params = dict(params or {})
+        self.ttl = ttl
+
+    def input_paths(self) -> list:
+        return [p for v in self.inputs.values() for p in _paths(v)]
+
+    def output_paths(self) -> list:
+        return [p for v in self.outputs.values() for p in _paths(v)]
+
+    def state_key(self) -> str:
+        return "|".join(self.output_paths()) or self.name
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{self.func.__module__}.{self.func.__qualname__}".encode())
+        digest.update(json.dumps(self.params, sort_keys=True, default=str).encode())
+
+        for key in sorted(self.inputs):
+            for path in _paths(self.inputs[key]):
+                digest.update(f"{key}={path}:{_file_hash(path)}".encode())
+
+        return digest.hexdigest()
+
+    def run(self):
+        return self.func(**self.inputs, **self.outputs, **self.params)
+
+
+class Pipeline:
+    def __init__(self, name, stages):
+        self.name = name
+        self.stages = {}
+
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+        producers = {}
+        for stage in self.stages.values():
+            for path in stage.output_paths():
+                if path in producers:
+                    raise ValueError(f"{path} is produced by both {producers[path]} and {stage.name}")
+                producers[path] = stage.name
+
+        self.deps = {
+            stage.name: {producers[p] for p in stage.input_paths() if p in producers and producers[p] != stage.name}
+            for stage in self.stages.values()
+        }
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list:
+        remaining = {name: set(deps) for name, deps in self.deps.items()}
+        order = []
+
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"Pipeline {self.name} has a dependency cycle: {sorted(remaining)}")
+
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return order
+
+    @staticmethod
+    def _load_state(state_path: str) -> dict:
+        if not os.path.exists(state_path):
+            return {}
+        with open(state_path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_state(state_path: str, state: dict):
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        with open(state_path, "w") as f:
+            json.dump(state, f, indent=2)
+
+    def is_stale(self, stage: Stage, record: dict | None, fingerprint: str) -> bool:
+        if record is None or record["fingerprint"] != fingerprint:
+            return True
+        if any(not os.path.exists(p) for p in stage.output_paths()):
+            return True
+        if stage.ttl is not None and time.time() - record["finished_at"] > stage.ttl:
+            return True
+        return False
+
+    def run(self, force: bool = False, max_workers: int = 4, state_path: str = STATE_PATH) -> dict:
+        state = self._load_state(state_path)
+        state_lock = threading.Lock()
+
+        status = {}
+        done = set()
+        running = {}
+        errors = []
+
+        def execute(stage, fingerprint):
+            stage.run()
+            with state_lock:
+                state[stage.state_key()] = {"fingerprint": fingerprint, "finished_at": time.time()}
+                self._save_state(state_path, state)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while len(done) < len(self.order) and not errors:
+                progressed = False
+
+                for name in self.order:
+                    if name in done or name in running or not self.deps[name] <= done:
+                        continue
+
+                    stage = self.stages[name]
+                    fingerprint = stage.fingerprint()
+
+                    if force or self.is_stale(stage, state.get(stage.state_key()), fingerprint):
+                        running[name] = pool.submit(execute, stage, fingerprint)
+                    else:
+                        status[name] = "skipped"
+                        done.add(name)
+                        progressed = True
+
+                if progressed or not running:
+                    continue
+
+                finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+
+                for name, future in list(running.items()):
+                    if future not in finished:
+                        continue
+
+                    del running[name]
+                    done.add(name)
+
+                    if future.exception() is not None:
+                        status[name] = "failed"
+                        errors.append((name, future.exception()))
+                    else:
+                        status[name] = "ran"
+
+            wait(running.values())
+
+        if errors:
+            name, error = errors[0]
+            raise RuntimeError(f"Stage {name} failed in pipeline {self.name}") from error
+
+        return status
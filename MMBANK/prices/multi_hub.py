@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from MMBANK.prices.region_orders import COUNT_FIELDS
+from MMBANK.prices.request_prices import HUB_PRICE_COLUMNS, MARKET_STATS_FIELDS, fetch_hub_prices
+from MMBANK.utils.http_client import DEFAULT_MAX_WORKERS, DEFAULT_RATE_PER_SEC, fetch_many
+
+HUB_REGIONS = {
+    "Jita": 10000002,
+    "Amarr": 10000043,
+    "Dodixie": 10000032,
+    "Rens": 10000030,
+    "Hek": 10000042,
+}
+
+PRICE_FIELDS = ["buyAvgFivePercent", "sellAvgFivePercent"]
+DIRECTIONS = ("input", "output")
+
+
+class HubMatrix:
+    def __init__(self, items: pd.DataFrame, hubs: list, fields: dict):
+        self.items = items.reset_index(drop=True)
+        self.hubs = list(hubs)
+        self.fields = fields
+        self.volume_m3 = self.items["volume_m3"].astype(float).fillna(0).to_numpy()
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame):
+        hubs = list(dict.fromkeys(df["hub"]))
+        items = df[df["item_id"].notna()].drop_duplicates("item_id")[["name", "item_id", "volume_m3"]]
+
+        fields = {}
+        for field in MARKET_STATS_FIELDS:
+            wide = df.pivot_table(index="item_id", columns="hub", values=field, aggfunc="last", dropna=False)
+            fields[field] = wide.reindex(index=items["item_id"], columns=hubs).to_numpy(dtype=np.float64)
+
+        return cls(items, hubs, fields)
+
+    def to_long(self) -> pd.DataFrame:
+        frames = []
+        for j, hub in enumerate(self.hubs):
+            df = self.items.copy()
+            df.insert(0, "hub", hub)
+            for field, values in self.fields.items():
+                df[field] = values[:, j]
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True)
+
+    def hub_frame(self, hub: str) -> pd.DataFrame:
+        df = self.to_long()
+        df = df[df["hub"] == hub][HUB_PRICE_COLUMNS].reset_index(drop=True)
+        df[COUNT_FIELDS] = df[COUNT_FIELDS].astype("Int64")
+        return df
+
+    def haul_costs(self, home: str, haul_rate) -> np.ndarray:
+        # haul_rate is ISK per m3 between home and each hub: a scalar or a {hub: rate} mapping.
+        if isinstance(haul_rate, dict):
+            rates = np.array([haul_rate.get(hub, 0) for hub in self.hubs], dtype=np.float64)
+        else:
+            rates = np.full(len(self.hubs), float(haul_rate))
+        rates[self.hubs.index(home)] = 0
+
+        # An unreachable hub has an inf rate, which leaves NaN for zero-volume items; best_venues skips those.
+        with np.errstate(invalid="ignore"):
+            return self.volume_m3[:, None] * rates[None, :]
+
+    def best_venues(self, home: str, haul_rate, direction: str, field: str = "sellAvgFivePercent") -> pd.DataFrame:
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}. Expected one of {DIRECTIONS}")
+
+        prices = self.fields[field]
+        haul = self.haul_costs(home, haul_rate)
+
+        if direction == "input":
+            # Inputs are bought at a hub and hauled home, so the landed cost is price plus haul.
+            landed = prices + haul
+            landed = np.where(np.isfinite(landed), landed, np.inf)
+            best = np.argmin(landed, axis=1)
+        else:
+            # Outputs are hauled from home to a hub, so the net revenue is price minus haul.
+            landed = prices - haul
+            landed = np.where(np.isfinite(landed), landed, -np.inf)
+            best = np.argmax(landed, axis=1)
+
+        rows = np.arange(len(best))
+        value = landed[rows, best]
+        priced = np.isfinite(value)
+
+        return pd.DataFrame({
+            "name": self.items["name"].to_numpy(),
+            "item_id": self.items["item_id"].to_numpy(),
+            "hub": np.where(priced, np.array(self.hubs, dtype=object)[best], None),
+            "price": np.where(priced, prices[rows, best], np.nan),
+            "haul_cost": np.where(priced, haul[rows, best], np.nan),
+            "landed_price": np.where(priced, value, np.nan),
+        })
+
+    def market_frame(self, home: str, haul_rate, direction: str) -> pd.DataFrame:
+        df = self.hub_frame(home)
+
+        for field in PRICE_FIELDS:
+            venues = self.best_venues(home, haul_rate, direction, field=field)
+            df[field] = venues["landed_price"].to_numpy()
+            df[f"{field}_hub"] = venues["hub"].to_numpy()
+
+        return df
+
+
+def fetch_hub_matrix(
+    items_df: pd.DataFrame,
+    hubs: dict = HUB_REGIONS,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_per_sec: float = DEFAULT_RATE_PER_SEC,
+    bypass_cache: bool = False,
+    output_csv: str | None = None,
+) -> HubMatrix:
+    names = list(hubs)
+
+    # Hubs run side by side, each fanning out per type; workers and rate are split so the totals stay at
+    # max_workers (the session's connection pool size) and rate_per_sec.
+    frames = fetch_many(
+        lambda hub: fetch_hub_prices(
+            items_df,
+            hubs[hub],
+            max_workers=max(1, max_workers // len(names)),
+            rate_per_sec=rate_per_sec / len(names),
+            bypass_cache=bypass_cache,
+        ),
+        names,
+        max_workers=min(len(names), max_workers),
+    )
+
+    long_df = pd.concat([df.assign(hub=hub) for hub, df in zip(names, frames)], ignore_index=True)
+    long_df = long_df[["hub"] + HUB_PRICE_COLUMNS]
+    if output_csv is not None:
+        long_df.to_csv(output_csv, index=False)
+
+    return HubMatrix.from_long(long_df)
+
+
+def load_hub_matrix(csv_path: str) -> HubMatrix:
+    return HubMatrix.from_long(pd.read_csv(csv_path))
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+from MMBANK.utils.http_client import DEFAULT_MAX_WORKERS, DEFAULT_RATE_PER_SEC, TokenBucket, fetch_many
+from MMBANK.utils.response_cache import cached_get_json
+
+ESI_ORDERS_URL = "https://esi.evetech.net/latest/markets/{region_id}/orders/"
+ESI_PAGE_SIZE = 1000
+ORDER_COLUMNS = ["type_id", "is_buy_order", "price", "volume_remain", "location_id"]
+JITA_4_4 = 60003760
+
+SIDES = ("buy", "sell")
+DEPTH_ARRAYS = ("type_ids", "offsets", "price", "volume")
+
+
+def get_region_orders(
+    region_id: int,
+    type_id: int,
+    order_type: str = "all",
+    bypass_cache: bool = False,
+    rate_limiter: TokenBucket | None = None,
+) -> list | None:
+    orders = []
+    page = 1
+
+    while True:
+        url = (
+            f"{ESI_ORDERS_URL.format(region_id=region_id)}"
+            f"?datasource=tranquility&order_type={order_type}&type_id={type_id}&page={page}"
+        )
+        data = cached_get_json(url, "esi/markets/orders", bypass_cache=bypass_cache, rate_limiter=rate_limiter)
+
+        if data is None:
+            return orders if page > 1 else None
+
+        orders.extend(data)
+        if len(data) < ESI_PAGE_SIZE:
+            return orders
+        page += 1
+
+
+def price_levels(orders: pd.DataFrame, side: str) -> pd.DataFrame:
+    is_buy = side == "buy"
+    df = orders[orders["is_buy_order"] == is_buy]
+
+    levels = df.groupby(["type_id", "price"], as_index=False)["volume_remain"].sum()
+    # Buy orders fill best-first from the highest bid, sell orders from the lowest ask.
+    return levels.sort_values(["type_id", "price"], ascending=[True, not is_buy], ignore_index=True)
+
+
+class BookSide:
+    def __init__(self, type_ids, offsets, price, volume):
+        self.type_ids = np.asarray(type_ids, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+        # One running total over all types with a leading zero: each type's slice stays monotonic, so a single
+        # searchsorted against base + quantity lands inside the right segment.
+        self.cum_volume = np.concatenate([[0], np.cumsum(self.volume)])
+        self.cum_value = np.concatenate([[0.0], np.cumsum(self.price * self.volume)])
+        self.rows = {int(t): i for i, t in enumerate(self.type_ids)}
+        self._level_price = np.append(self.price, np.nan)
+
+    @classmethod
+    def from_levels(cls, levels: pd.DataFrame):
+        type_ids, counts = np.unique(levels["type_id"].to_numpy(dtype=np.int64), return_counts=True)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(type_ids, offsets, levels["price"].to_numpy(), levels["volume_remain"].to_numpy())
+
+    def _segments(self, type_ids):
+        rows = np.array([self.rows.get(int(t), -1) for t in type_ids], dtype=np.int64)
+        known = rows >= 0
+        start = np.where(known, self.offsets[np.maximum(rows, 0)], 0)
+        end = np.where(known, self.offsets[np.minimum(np.maximum(rows, 0) + 1, len(self.offsets) - 1)], 0)
+        return known & (end > start), start, end
+
+    def depth(self, type_ids) -> np.ndarray:
+        valid, start, end = self._segments(type_ids)
+        return np.where(valid, self.cum_volume[end] - self.cum_volume[start], 0)
+
+    def best_price(self, type_ids) -> np.ndarray:
+        valid, start, _ = self._segments(type_ids)
+        return np.where(valid, self._level_price[start], np.nan)
+
+    def fill_price(self, type_ids, quantities) -> np.ndarray:
+        type_ids = np.atleast_1d(type_ids)
+        quantities = np.broadcast_to(np.asarray(quantities, dtype=np.float64), type_ids.shape)
+
+        valid, start, end = self._segments(type_ids)
+        level = np.searchsorted(self.cum_volume, self.cum_volume[start] + quantities, side="left") - 1
+        filled = valid & (quantities > 0) & (level < end)
+
+        level = np.where(filled, level, start)
+        value_before = self.cum_value[level] - self.cum_value[start]
+        volume_before = self.cum_volume[level] - self.cum_volume[start]
+
+        value = value_before + (quantities - volume_before) * self._level_price[level]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(filled, value / quantities, np.nan)
+
+    def arrays(self) -> dict:
+        return {name: getattr(self, name) for name in DEPTH_ARRAYS}
+
+
+class MarketDepth:
+    def __init__(self, buy: BookSide, sell: BookSide, region_id: int | None = None):
+        self.buy = buy
+        self.sell = sell
+        self.region_id = region_id
+
+    @classmethod
+    def from_orders(cls, orders, region_id: int | None = None, location_id: int | None = None):
+        df = pd.DataFrame(orders, columns=ORDER_COLUMNS)
+        if location_id is not None:
+            df = df[df["location_id"] == location_id]
+
+        return cls(
+            BookSide.from_levels(price_levels(df, "buy")),
+            BookSide.from_levels(price_levels(df, "sell")),
+            region_id=region_id,
+        )
+
+    def side(self, side: str) -> BookSide:
+        if side not in SIDES:
+            raise ValueError(f"Unknown order book side: {side}")
+        return self.buy if side == "buy" else self.sell
+
+    def fill_price(self, type_ids, quantities, side: str) -> np.ndarray:
+        return self.side(side).fill_price(type_ids, quantities)
+
+    def summary(self, type_ids, quantities) -> pd.DataFrame:
+        type_ids = np.atleast_1d(np.asarray(type_ids, dtype=np.int64))
+        return pd.DataFrame({
+            "item_id": type_ids,
+            "quantity": np.broadcast_to(quantities, type_ids.shape),
+            "best_buy": self.buy.best_price(type_ids),
+            "best_sell": self.sell.best_price(type_ids),
+            "buy_depth": self.buy.depth(type_ids),
+            "sell_depth": self.sell.depth(type_ids),
+            "buy_fill_price": self.buy.fill_price(type_ids, quantities),
+            "sell_fill_price": self.sell.fill_price(type_ids, quantities),
+        })
+
+    def save(self, path: str):
+        arrays = {f"{side}_{name}": value for side in SIDES for name, value in self.side(side).arrays().items()}
+        np.savez_compressed(path, region_id=np.int64(self.region_id or 0), **arrays)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            sides = {
+                side: BookSide(data[f"{side}_type_ids"], data[f"{side}_offsets"], data[f"{side}_price"],
+                               data[f"{side}_volume"])
+                for side in SIDES
+            }
+            region_id = int(data["region_id"]) or None
+
+        return cls(sides["buy"], sides["sell"], region_id=region_id)
+
+
+def fetch_market_depth(
+    type_ids,
+    region_id: int,
+    location_id: int | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_per_sec: float = DEFAULT_RATE_PER_SEC,
+    bypass_cache: bool = False,
+) -> MarketDepth:
+    to_fetch = sorted({int(t) for t in type_ids if pd.notna(t)})
+
+    limiter = TokenBucket(rate_per_sec)
+    pages = fetch_many(
+        lambda type_id: get_region_orders(region_id, type_id, bypass_cache=bypass_cache, rate_limiter=limiter),
+        to_fetch,
+        max_workers=max_workers,
+    )
+
+    orders = [order for page in pages if page for order in page]
+    return MarketDepth.from_orders(orders, region_id=region_id, location_id=location_id)
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import requests
+
+from MMBANK.prices.order_book import ESI_ORDERS_URL, ORDER_COLUMNS
+from MMBANK.prices.request_prices import HUB_PRICE_COLUMNS, MARKET_STATS_FIELDS
+from MMBANK.utils.http_client import DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT, TokenBucket, fetch_many, get_session
+
+# Capped at the shared session's connection pool so every worker keeps its keep-alive connection.
+ESI_MAX_WORKERS = DEFAULT_MAX_WORKERS
+ESI_RATE_PER_SEC = 50.0
+FIVE_PERCENT = 0.05
+SELL_THRESHOLD_FACTOR = 10
+BUY_THRESHOLD_FACTOR = 0.1
+COUNT_FIELDS = ["buyVolume", "sellVolume", "buyOrders", "sellOrders", "sellOutliers", "buyOutliers"]
+
+
+def _get_orders_page(region_id: int, page: int, base_url: str = ESI_ORDERS_URL):
+    url = f"{base_url.format(region_id=region_id)}?datasource=tranquility&order_type=all&page={page}"
+    try:
+        response = get_session().get(url, timeout=DEFAULT_TIMEOUT)
+    except requests.RequestException:
+        return None, 0
+
+    if response.status_code != 200:
+        return None, 0
+
+    # A truncated or HTML error body fails just this page rather than the whole dump.
+    try:
+        return response.json(), int(response.headers.get("X-Pages", 1))
+    except ValueError:
+        return None, 0
+
+
+def fetch_region_orders(
+    region_id: int,
+    max_workers: int = ESI_MAX_WORKERS,
+    rate_per_sec: float = ESI_RATE_PER_SEC,
+    base_url: str = ESI_ORDERS_URL,
+) -> pd.DataFrame:
+    first, pages = _get_orders_page(region_id, 1, base_url)
+    if first is None:
+        raise RuntimeError(f"Failed to fetch orders for region {region_id}")
+
+    limiter = TokenBucket(rate_per_sec)
+    rest = fetch_many(
+        lambda page: _get_orders_page(region_id, page, base_url)[0],
+        range(2, pages + 1),
+        max_workers=max_workers,
+        rate_limiter=limiter,
+    )
+
+    failed = [page for page, data in zip(range(2, pages + 1), rest) if data is None]
+    if failed:
+        raise RuntimeError(f"Failed to fetch order pages {failed} for region {region_id}")
+
+    return pd.DataFrame([order for data in [first] + rest for order in data], columns=ORDER_COLUMNS)
+
+
+def load_order_dump(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    elif path.endswith(".json"):
+        df = pd.read_json(path)
+    else:
+        df = pd.read_csv(path)
+
+    return df[ORDER_COLUMNS]
+
+
+def _side_stats(orders: pd.DataFrame, is_buy: bool) -> pd.DataFrame:
+    side = "buy" if is_buy else "sell"
+    df = orders[orders["is_buy_order"] == is_buy]
+
+    best = df.groupby("type_id")["price"].agg("max" if is_buy else "min")
+    threshold = best * (BUY_THRESHOLD_FACTOR if is_buy else SELL_THRESHOLD_FACTOR)
+
+    limit = df["type_id"].map(threshold).to_numpy()
+    price = df["price"].to_numpy()
+    outlier = price < limit if is_buy else price > limit
+
+    valid = df[~outlier]
+    outliers = pd.Series(outlier, index=df.index).groupby(df["type_id"]).sum()
+
+    # Walk each type's book best-first and average the price over the first 5% of its volume.
+    valid = valid.sort_values(["type_id", "price"], ascending=[True, not is_buy])
+    volume = valid["volume_remain"].to_numpy(dtype=np.float64)
+    type_ids = valid["type_id"].to_numpy()
+
+    total = valid.groupby("type_id")["volume_remain"].transform("sum").to_numpy(dtype=np.float64)
+    cum_before = valid.groupby("type_id")["volume_remain"].cumsum().to_numpy(dtype=np.float64) - volume
+    take = np.clip(total * FIVE_PERCENT - cum_before, 0, volume)
+
+    weighted = pd.DataFrame({"type_id": type_ids, "value": take * valid["price"].to_numpy(), "take": take})
+    sums = weighted.groupby("type_id")[["value", "take"]].sum()
+
+    return pd.DataFrame({
+        f"{side}Volume": valid.groupby("type_id")["volume_remain"].sum(),
+        f"{side}Orders": valid.groupby("type_id").size(),
+        f"{side}Outliers": outliers,
+        f"{side}Threshold": threshold,
+        f"{side}AvgFivePercent": sums["value"] / sums["take"],
+    })
+
+
+def order_stats(orders: pd.DataFrame, location_id: int | None = None) -> pd.DataFrame:
+    if location_id is not None:
+        orders = orders[orders["location_id"] == location_id]
+
+    stats = pd.concat([_side_stats(orders, True), _side_stats(orders, False)], axis=1)
+
+    stats[COUNT_FIELDS] = stats[COUNT_FIELDS].fillna(0).astype(np.int64)
+
+    return stats[MARKET_STATS_FIELDS]
+
+
+def hub_prices_from_orders(items_df: pd.DataFrame, orders: pd.DataFrame, location_id: int | None = None) -> pd.DataFrame:
+    required_cols = {"name", "item_id", "volume_m3"}
+    if not required_cols.issubset(items_df.columns):
+        raise ValueError(f"Input CSV must contain columns: {required_cols}")
+
+    stats = order_stats(orders, location_id=location_id)
+
+    df = items_df[["name", "item_id", "volume_m3"]].copy()
+    known = df["item_id"].notna()
+    type_ids = df["item_id"].where(known, -1).astype(np.int64)
+
+    df = df.join(stats.reindex(type_ids.to_numpy()).set_axis(df.index))
+    df.loc[known, COUNT_FIELDS] = df.loc[known, COUNT_FIELDS].fillna(0)
+    df[COUNT_FIELDS] = df[COUNT_FIELDS].astype("Int64")
+    if not known.all():
+        df.loc[~known, "item_id"] = None
+
+    return df[HUB_PRICE_COLUMNS]
+
+
+def request_hub_prices_bulk(
+    input_csv_path: str,
+    output_csv_path: str,
+    region_id: int,
+    dump_path: str | None = None,
+    location_id: int | None = None,
+):
+    orders = load_order_dump(dump_path) if dump_path is not None else fetch_region_orders(region_id)
+
+    result_df = hub_prices_from_orders(pd.read_csv(input_csv_path), orders, location_id=location_id)
+    result_df.to_csv(output_csv_path, index=False)
@@ -1,95 +1,152 @@
-import requests
 import pandas as pd
-import time
+
+from MMBANK.utils.http_client import DEFAULT_MAX_WORKERS, DEFAULT_RATE_PER_SEC, TokenBucket, fetch_many
+from MMBANK.storage.timeseries import append_snapshot
+from MMBANK.utils.response_cache import cached_get_json
 
 EVETYCOON_BASE = "https://evetycoon.com/api/v1/market/stats"
+ESI_PRICES_URL = "https://esi.evetech.net/latest/markets/prices/?datasource=tranquility"
 
+MARKET_STATS_FIELDS = [
+    "buyVolume",
+    "sellVolume",
+    "buyOrders",
+    "sellOrders",
+    "sellOutliers",
+    "buyOutliers",
+    "buyThreshold",
+    "sellThreshold",
+    "buyAvgFivePercent",
+    "sellAvgFivePercent",
+]
 
-def get_market_stats(region_id: int, type_id: int) -> dict | None:
-    url = f"{EVETYCOON_BASE}/{region_id}/{type_id}"
-    response = requests.get(url, timeout=15)
+HUB_PRICE_COLUMNS = ["name", "item_id", "volume_m3"] + MARKET_STATS_FIELDS
 
-    if response.status_code != 200:
-        return None
 
-    return response.json()
+def get_market_stats(
+    region_id: int,
+    type_id: int,
+    base_url: str = EVETYCOON_BASE,
+    bypass_cache: bool = False,
+    rate_limiter: TokenBucket | None = None,
+) -> dict | None:
+    url = f"{base_url}/{region_id}/{type_id}"
+    return cached_get_json(url, "evetycoon/stats", bypass_cache=bypass_cache, rate_limiter=rate_limiter)
 
 
-def request_hub_prices(
-    input_csv_path: str,
-    output_csv_path: str,
+def fetch_hub_prices(
+    items_df: pd.DataFrame,
     region_id: int,
-    sleep_sec: float = 0.15
-):
-    df = pd.read_csv(input_csv_path)
-
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_per_sec: float = DEFAULT_RATE_PER_SEC,
+    base_url: str = EVETYCOON_BASE,
+    bypass_cache: bool = False,
+) -> pd.DataFrame:
     required_cols = {"name", "item_id", "volume_m3"}
-    if not required_cols.issubset(df.columns):
+    if not required_cols.issubset(items_df.columns):
         raise ValueError(f"Input CSV must contain columns: {required_cols}")
 
+    rows = items_df[["name", "item_id", "volume_m3"]].to_dict(orient="records")
+    to_fetch = sorted({int(row["item_id"]) for row in rows if pd.notna(row["item_id"])})
+
+    limiter = TokenBucket(rate_per_sec)
+    stats_list = fetch_many(
+        lambda type_id: get_market_stats(region_id, type_id, base_url=base_url, bypass_cache=bypass_cache,
+                                         rate_limiter=limiter),
+        to_fetch,
+        max_workers=max_workers,
+    )
+    stats_map = dict(zip(to_fetch, stats_list))
+
     results = []
 
-    for _, row in df.iterrows():
-        name = row["name"]
+    for row in rows:
         type_id = row["item_id"]
-        volume_m3 = row["volume_m3"]
 
         if pd.isna(type_id):
             results.append({
-                "name": name,
+                "name": row["name"],
                 "item_id": None,
-                "volume_m3": volume_m3,
-                "buyVolume": None,
-                "sellVolume": None,
-                "buyOrders": None,
-                "sellOrders": None,
-                "sellOutliers": None,
-                "buyOutliers": None,
-                "buyThreshold": None,
-                "sellThreshold": None,
-                "buyAvgFivePercent": None,
-                "sellAvgFivePercent": None,
+                "volume_m3": row["volume_m3"],
+                **{field: None for field in MARKET_STATS_FIELDS},
             })
             continue
 
-        stats = get_market_stats(region_id, int(type_id))
+        stats = stats_map.get(int(type_id))
 
         if stats is None:
-            time.sleep(sleep_sec)
             continue
 
         results.append({
-            "name": name,
+            "name": row["name"],
             "item_id": type_id,
-            "volume_m3": volume_m3,
-            "buyVolume": stats.get("buyVolume"),
-            "sellVolume": stats.get("sellVolume"),
-            "buyOrders": stats.get("buyOrders"),
-            "sellOrders": stats.get("sellOrders"),
-            "sellOutliers": stats.get("sellOutliers"),
-            "buyOutliers": stats.get("buyOutliers"),
-            "buyThreshold": stats.get("buyThreshold"),
-            "sellThreshold": stats.get("sellThreshold"),
-            "buyAvgFivePercent": stats.get("buyAvgFivePercent"),
-            "sellAvgFivePercent": stats.get("sellAvgFivePercent"),
+            "volume_m3": row["volume_m3"],
+            **{field: stats.get(field) for field in MARKET_STATS_FIELDS},
         })
 
-        time.sleep(sleep_sec)
+    return pd.DataFrame(results, columns=HUB_PRICE_COLUMNS)
+
+
+def request_hub_prices(
+    input_csv_path: str,
+    output_csv_path: str,
+    region_id: int,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_per_sec: float = DEFAULT_RATE_PER_SEC,
+    base_url: str = EVETYCOON_BASE,
+    bypass_cache: bool = False,
+    snapshot: bool = False,
+):
+    df = pd.read_csv(input_csv_path)
 
-    result_df = pd.DataFrame(results)
+    result_df = fetch_hub_prices(
+        df,
+        region_id,
+        max_workers=max_workers,
+        rate_per_sec=rate_per_sec,
+        base_url=base_url,
+        bypass_cache=bypass_cache,
+    )
     result_df.to_csv(output_csv_path, index=False)
 
+    if snapshot:
+        append_snapshot(result_df, region_id)
 
-def update_csv_with_adjusted_prices(csv_path: str):
-    url = "https://esi.evetech.net/latest/markets/prices/?datasource=tranquility"
-    response = requests.get(url)
 
-    if response.status_code != 200:
-        print(f"Error: {response.status_code}")
-        return
+def get_adjusted_prices(bypass_cache: bool = False) -> list | None:
+    return cached_get_json(ESI_PRICES_URL, "esi/markets/prices", bypass_cache=bypass_cache)
+
+
+def get_adjusted_price_map(bypass_cache: bool = False) -> dict | None:
+    api_prices = get_adjusted_prices(bypass_cache=bypass_cache)
+
+    if api_prices is None:
+        print("Error: failed to fetch adjusted prices")
+        return None
+
+    return {item['type_id']: item.get('adjusted_price', 0) for item in api_prices}
+
+
+def add_adjusted_prices(df: pd.DataFrame, bypass_cache: bool = False) -> pd.DataFrame | None:
+    adj_price_map = get_adjusted_price_map(bypass_cache=bypass_cache)
 
-    api_prices = response.json()
-    adj_price_map = {item['type_id']: item.get('adjusted_price', 0) for item in api_prices}
+    if adj_price_map is None:
+        return None
+
+    df = df.copy()
+    df['adjusted_price'] = df['item_id'].map(adj_price_map).fillna(0)
+
+    return df
+
+
+def update_csv_with_adjusted_prices(csv_path, bypass_cache: bool = False):
+    if isinstance(csv_path, pd.DataFrame):
+        return add_adjusted_prices(csv_path, bypass_cache=bypass_cache)
+
+    adj_price_map = get_adjusted_price_map(bypass_cache=bypass_cache)
+
+    if adj_price_map is None:
+        return
 
     df = pd.read_csv(csv_path)
 
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from MMBANK.reactions.reaction_production import SWEEP_DEFAULTS
+from MMBANK.utils.bp_index import FUZZWORK_DIR, load_blueprint_index
+
+
+BUILD_ACTIVITIES = (11, 1)
+CHOICES = ("cheapest", "buy", "build")
+
+
+class BuildTree:
+    def __init__(
+            self,
+            prices_df: pd.DataFrame,
+            facilities: dict | None = None,
+            overrides: dict | None = None,
+            adjusted_prices: dict | None = None,
+            fuzzwork_dir: str = FUZZWORK_DIR,
+    ):
+        prices_df = prices_df.drop_duplicates(subset=["item_id"], keep="last")
+        adj_column = "adjusted_price" if "adjusted_price" in prices_df.columns else "price"
+
+        self.market_price = prices_df.set_index("item_id")["price"].dropna().to_dict()
+        self.adjusted_price = prices_df.set_index("item_id")[adj_column].fillna(0).to_dict()
+        self.adjusted_price.update(adjusted_prices or {})
+        self.facilities = {
+            activity: {**SWEEP_DEFAULTS, **{k: v for k, v in (facilities or {}).get(activity, {}).items() if k in SWEEP_DEFAULTS}}
+            for activity in BUILD_ACTIVITIES
+        }
+        self.overrides = dict(overrides or {})
+        self.index = load_blueprint_index(fuzzwork_dir)
+
+        unknown = set(self.overrides.values()) - set(CHOICES)
+        if unknown:
+            raise ValueError(f"Unknown build choices: {sorted(unknown)}")
+
+        self._recipes = {}
+        self._nodes = {}
+
+    def recipe(self, type_id: int) -> tuple[int, int] | None:
+        type_id = int(type_id)
+
+        if type_id not in self._recipes:
+            self._recipes[type_id] = None
+            for activity in BUILD_ACTIVITIES:
+                bp_id = self.index.blueprint_for(type_id, activity)
+                if bp_id is not None:
+                    self._recipes[type_id] = (activity, bp_id)
+                    break
+
+        return self._recipes[type_id]
+
+    def resolve(self, type_ids) -> list:
+        order = []
+        state = {}
+
+        for root in type_ids:
+            stack = [(int(root), False)]
+
+            while stack:
+                type_id, expanded = stack.pop()
+
+                if expanded:
+                    state[type_id] = "done"
+                    order.append(type_id)
+                    continue
+
+                if state.get(type_id) is not None:
+                    continue
+
+                state[type_id] = "visiting"
+                stack.append((type_id, True))
+
+                recipe = self.recipe(type_id)
+                if recipe is None or self.overrides.get(type_id) == "buy":
+                    continue
+
+                mat_types, _ = self.index.materials(recipe[1], recipe[0])
+                for mat_id in mat_types[::-1]:
+                    if state.get(int(mat_id)) is None:
+                        stack.append((int(mat_id), False))
+
+        return order
+
+    def _cost_node(self, type_id: int) -> dict:
+        buy_price = self.market_price.get(type_id, np.nan)
+        recipe = self.recipe(type_id)
+        choice = self.overrides.get(type_id, "cheapest")
+
+        node = {
+            "item_id": type_id,
+            "activity_id": None,
+            "BPO_id": None,
+            "buy_price": buy_price,
+            "EIV_value": np.nan,
+            "Material_cost": np.nan,
+            "Job_cost": np.nan,
+            "build_cost": np.nan,
+            "build_priced": False,
+        }
+
+        if recipe is not None and choice != "buy":
+            activity, bp_id = recipe
+            params = self.facilities[activity]
+
+            mat_types, mat_qty = self.index.materials(bp_id, activity)
+            qty_base = np.asarray(mat_qty, dtype=np.float64)
+
+            if activity == 11:
+                qty_eff = qty_base
+            else:
+                qty_eff = np.maximum(1, np.round(qty_base * (1 - params["ME_BPO"]) * (1 - params["ME_structure"]), 0))
+
+            unit_costs = np.array([
+                self._nodes[int(m)]["unit_cost"] if int(m) in self._nodes else self.market_price.get(int(m), np.nan)
+                for m in mat_types
+            ], dtype=np.float64)
+            adj_prices = np.array([self.adjusted_price.get(int(m), 0) for m in mat_types], dtype=np.float64)
+
+            material_cost = float(np.dot(qty_eff, np.nan_to_num(unit_costs)))
+            base_job_value_eiv = float(np.dot(qty_base, adj_prices))
+
+            job_rate = (
+                params["system_cost_index"] * (1 - params["structure_discount"])
+                + params["facility_tax"] + params["scc_tax"]
+            )
+            job_cost = base_job_value_eiv * job_rate
+            quantity = max(1, self.index.output_quantity(bp_id, activity))
+
+            node.update({
+                "activity_id": activity,
+                "BPO_id": bp_id,
+                "EIV_value": base_job_value_eiv / quantity,
+                "Material_cost": material_cost / quantity,
+                "Job_cost": job_cost / quantity,
+                "build_cost": (material_cost + job_cost) / quantity,
+                "build_priced": not np.isnan(unit_costs).any(),
+            })
+
+        if choice == "build" and not np.isnan(node["build_cost"]):
+            node["choice"] = "build"
+        elif choice == "buy" or np.isnan(node["build_cost"]):
+            node["choice"] = "buy"
+        elif np.isnan(buy_price) or (node["build_priced"] and node["build_cost"] < buy_price):
+            node["choice"] = "build"
+        else:
+            node["choice"] = "buy"
+
+        # A build with unpriced inputs only has a partial cost, so it stays NaN rather than look complete.
+        if node["choice"] == "build":
+            node["unit_cost"] = node["build_cost"] if node["build_priced"] else np.nan
+        else:
+            node["unit_cost"] = buy_price
+
+        return node
+
+    def cost(self, type_ids) -> pd.DataFrame:
+        for type_id in self.resolve(type_ids):
+            if type_id not in self._nodes:
+                self._nodes[type_id] = self._cost_node(type_id)
+
+        return pd.DataFrame([self._nodes[int(t)] for t in type_ids])
+
+    def nodes(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self._nodes.values()))
+
+    def unit_cost(self, type_id: int) -> float:
+        return float(self.cost([type_id])["unit_cost"].iloc[0])
@@ -1,11 +1,78 @@
-import pandas as pd
 import json
+from itertools import chain
 
+import numpy as np
+import pandas as pd
 
-def calculate_production(
-        input_path: str,
-        prices_path: str,
-        output_path: str,
+from MMBANK.utils.materials_imput import as_frame
+
+PRODUCTION_COLUMNS = ["name", "item_id", "EIV_value", "Material_cost", "Job_cost", "Total_production_price"]
+
+# Python's round() is correctly rounded, np.round is not; keep the CSV output identical to the scalar engine.
+_round = np.frompyfunc(round, 2, 1)
+
+
+def _parse_materials(values) -> list:
+    try:
+        return json.loads("[" + ",".join(values) + "]")
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    parsed = []
+    for value in values:
+        try:
+            parsed.append(json.loads(value))
+        except (json.JSONDecodeError, TypeError):
+            parsed.append(None)
+
+    return parsed
+
+
+def explode_materials(bpo_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    parsed = _parse_materials(bpo_df["materials"].tolist())
+    valid = np.array([mats is not None for mats in parsed], dtype=bool)
+
+    blueprints = bpo_df.loc[valid].reset_index(drop=True)
+    if "quantity" not in blueprints.columns:
+        blueprints["quantity"] = 1
+
+    mats = [m for m in parsed if m is not None]
+    lengths = np.fromiter((len(m) for m in mats), dtype=np.int64, count=len(mats))
+    flat = list(chain.from_iterable(mats))
+
+    materials = pd.DataFrame({
+        "bp": np.repeat(np.arange(len(mats), dtype=np.int64), lengths),
+        "type_id": np.fromiter((m["type_id"] for m in flat), dtype=np.int64, count=len(flat)),
+        "quantity": np.fromiter((m["quantity"] for m in flat), dtype=np.float64, count=len(flat)),
+    })
+
+    return blueprints, materials
+
+
+def _price_lookup(prices_df: pd.DataFrame, column: str, type_ids: np.ndarray) -> np.ndarray:
+    prices = prices_df.drop_duplicates(subset=["item_id"], keep="last").set_index("item_id")[column]
+    values = prices.reindex(type_ids).to_numpy(dtype=np.float64, copy=True)
+    values[~np.isin(type_ids, prices.index.to_numpy())] = 0
+
+    return values
+
+
+def base_job_values(blueprints: pd.DataFrame, materials: pd.DataFrame, prices_df: pd.DataFrame) -> np.ndarray:
+    adj_column = "adjusted_price" if "adjusted_price" in prices_df.columns else "price"
+
+    type_ids = materials["type_id"].to_numpy(dtype=np.int64)
+    qty_base = materials["quantity"].to_numpy(dtype=np.float64)
+    bp = materials["bp"].to_numpy(dtype=np.int64)
+
+    a_price = _price_lookup(prices_df, adj_column, type_ids)
+
+    return np.bincount(bp, weights=qty_base * a_price, minlength=len(blueprints))
+
+
+def production_costs(
+        blueprints: pd.DataFrame,
+        materials: pd.DataFrame,
+        prices_df: pd.DataFrame,
         ME_structure: float = 0,
         ME_BPO: float = 0,
         system_cost_index: float = 0,
@@ -13,59 +80,157 @@ def calculate_production(
         scc_tax: float = 0.04,
         structure_discount: float = 0.05,
         activity_id: int = 1,
-):
-    df = pd.read_csv(input_path)
-    prices_df = pd.read_csv(prices_path)
+) -> pd.DataFrame:
+    adj_column = "adjusted_price" if "adjusted_price" in prices_df.columns else "price"
 
-    market_price_map = prices_df.set_index("item_id")["price"].to_dict()
-    adj_price_map = prices_df.set_index("item_id").get("adjusted_price", prices_df.set_index("item_id")["price"]).to_dict()
+    type_ids = materials["type_id"].to_numpy(dtype=np.int64)
+    qty_base = materials["quantity"].to_numpy(dtype=np.float64)
+    bp = materials["bp"].to_numpy(dtype=np.int64)
 
-    rows = []
+    m_price = _price_lookup(prices_df, "price", type_ids)
+    a_price = _price_lookup(prices_df, adj_column, type_ids)
 
-    for _, row in df.iterrows():
-        try:
-            materials = json.loads(row["materials"])
-            quantity = row.get("quantity", 1)
-        except (json.JSONDecodeError, TypeError):
-            continue
+    if activity_id == 11:
+        qty_eff = qty_base
+    else:
+        qty_eff = np.maximum(1, np.round(qty_base * (1 - ME_BPO) * (1 - ME_structure), 0))
+
+    n_bp = len(blueprints)
+    material_cost = np.bincount(bp, weights=qty_eff * m_price, minlength=n_bp)
+    base_job_value_eiv = np.bincount(bp, weights=qty_base * a_price, minlength=n_bp)
+
+    job_gross_rate = system_cost_index * (1 - structure_discount)
+    total_tax_rate = facility_tax + scc_tax
+
+    job_cost = base_job_value_eiv * (job_gross_rate + total_tax_rate)
+    total_price = material_cost + job_cost
+
+    quantity = blueprints["quantity"].to_numpy(dtype=np.float64)
+    quantity = np.where(quantity <= 0, 1, quantity)
+
+    return pd.DataFrame({
+        "name": blueprints["name"].to_numpy(),
+        "item_id": blueprints["item_id"].to_numpy(),
+        "EIV_value": _round(base_job_value_eiv / quantity, 2).astype(np.float64),
+        "Material_cost": _round(material_cost / quantity, 2).astype(np.float64),
+        "Job_cost": _round(job_cost / quantity, 2).astype(np.float64),
+        "Total_production_price": _round(total_price / quantity, 2).astype(np.float64),
+    }, columns=PRODUCTION_COLUMNS)
+
+
+def calculate_production(
+        input_path,
+        prices_path,
+        output_path: str | None = None,
+        ME_structure: float = 0,
+        ME_BPO: float = 0,
+        system_cost_index: float = 0,
+        facility_tax: float = 0,
+        scc_tax: float = 0.04,
+        structure_discount: float = 0.05,
+        activity_id: int = 1,
+):
+    df = as_frame(input_path)
+    prices_df = as_frame(prices_path)
+
+    blueprints, materials = explode_materials(df)
+
+    result_df = production_costs(
+        blueprints,
+        materials,
+        prices_df,
+        ME_structure=ME_structure,
+        ME_BPO=ME_BPO,
+        system_cost_index=system_cost_index,
+        facility_tax=facility_tax,
+        scc_tax=scc_tax,
+        structure_discount=structure_discount,
+        activity_id=activity_id,
+    )
+    if output_path is not None:
+        result_df.to_csv(output_path, index=False)
+
+    return result_df
+
+
+SWEEP_DEFAULTS = {
+    "ME_structure": 0,
+    "ME_BPO": 0,
+    "system_cost_index": 0,
+    "facility_tax": 0,
+    "scc_tax": 0.04,
+    "structure_discount": 0.05,
+}
+
+
+def parameter_grid(grid: dict) -> pd.DataFrame:
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    axes = {name: np.atleast_1d(grid.get(name, default)) for name, default in SWEEP_DEFAULTS.items()}
+    mesh = np.meshgrid(*axes.values(), indexing="ij")
+
+    configs = pd.DataFrame({name: values.ravel() for name, values in zip(axes, mesh)})
+    configs.index.name = "config"
+
+    return configs
+
+
+def sweep_production(
+        blueprints: pd.DataFrame,
+        materials: pd.DataFrame,
+        prices_df: pd.DataFrame,
+        grid: dict,
+        activity_id: int = 1,
+) -> pd.DataFrame:
+    configs = parameter_grid(grid)
+    adj_column = "adjusted_price" if "adjusted_price" in prices_df.columns else "price"
+
+    type_ids = materials["type_id"].to_numpy(dtype=np.int64)
+    qty_base = materials["quantity"].to_numpy(dtype=np.float64)
+    bp = materials["bp"].to_numpy(dtype=np.int64)
 
-        is_reaction = (activity_id == 11)
+    m_price = _price_lookup(prices_df, "price", type_ids)
+    a_price = _price_lookup(prices_df, adj_column, type_ids)
 
-        material_cost = 0.0
-        base_job_value_eiv = 0.0
+    n_bp = len(blueprints)
+    n_cfg = len(configs)
 
-        for mat in materials:
-            mat_id = mat["type_id"]
-            qty_base = mat["quantity"]
+    base_job_value_eiv = np.bincount(bp, weights=qty_base * a_price, minlength=n_bp)
 
-            m_price = market_price_map.get(mat_id, 0)
-            a_price = adj_price_map.get(mat_id, 0)
+    if activity_id == 11:
+        material_cost = np.broadcast_to(np.bincount(bp, weights=qty_base * m_price, minlength=n_bp), (n_cfg, n_bp))
+    else:
+        me_pairs, me_index = np.unique(configs[["ME_BPO", "ME_structure"]].to_numpy(), axis=0, return_inverse=True)
+        me_factor = (1 - me_pairs[:, 0]) * (1 - me_pairs[:, 1])
 
-            if is_reaction:
-                qty_eff = qty_base
-            else:
-                qty_eff = max(1, round(qty_base * (1 - ME_BPO) * (1 - ME_structure), 0))
+        qty_eff = np.maximum(1, np.round(qty_base[None, :] * me_factor[:, None], 0))
+        flat_bp = (np.arange(len(me_pairs))[:, None] * n_bp + bp[None, :]).ravel()
+        per_me = np.bincount(flat_bp, weights=(qty_eff * m_price).ravel(), minlength=len(me_pairs) * n_bp)
+        material_cost = per_me.reshape(len(me_pairs), n_bp)[me_index.ravel()]
 
-            material_cost += qty_eff * m_price
-            base_job_value_eiv += qty_base * a_price
+    job_rate = (
+        configs["system_cost_index"] * (1 - configs["structure_discount"])
+        + configs["facility_tax"] + configs["scc_tax"]
+    ).to_numpy()
 
-        job_gross_rate = system_cost_index * (1 - structure_discount)
-        total_tax_rate = facility_tax + scc_tax
+    job_cost = base_job_value_eiv[None, :] * job_rate[:, None]
+    total_price = material_cost + job_cost
 
-        job_cost = base_job_value_eiv * (job_gross_rate + total_tax_rate)
-        total_price = material_cost + job_cost
+    quantity = blueprints["quantity"].to_numpy(dtype=np.float64)
+    quantity = np.where(quantity <= 0, 1, quantity)[None, :]
 
-        if quantity <= 0:
-            quantity = 1
+    result = pd.DataFrame({
+        "item_id": np.tile(blueprints["item_id"].to_numpy(), n_cfg),
+        "config": np.repeat(configs.index.to_numpy(), n_bp),
+        "name": np.tile(blueprints["name"].to_numpy(), n_cfg),
+        "EIV_value": _round(np.broadcast_to(base_job_value_eiv / quantity, (n_cfg, n_bp)).ravel(), 2).astype(np.float64),
+        "Material_cost": _round((material_cost / quantity).ravel(), 2).astype(np.float64),
+        "Job_cost": _round((job_cost / quantity).ravel(), 2).astype(np.float64),
+        "Total_production_price": _round((total_price / quantity).ravel(), 2).astype(np.float64),
+    })
 
-        rows.append({
-            "name": row["name"],
-            "item_id": row["item_id"],
-            "EIV_value": round(base_job_value_eiv / quantity, 2),
-            "Material_cost": round(material_cost / quantity, 2),
-            "Job_cost": round(job_cost / quantity, 2),
-            "Total_production_price": round(total_price / quantity, 2),
-        })
+    result = result.join(configs, on="config")
 
-    result_df = pd.DataFrame(rows)
-    result_df.to_csv(output_path, index=False)
+    return result.set_index(["item_id", "config"])
@@ -1,17 +1,14 @@
-import requests
+from functools import lru_cache
+
 import pandas as pd
-import time
-import os
 from PIL import Image, ImageDraw, ImageFont
 
+from MMBANK.storage.timeseries import read_history, update_history
+from MMBANK.utils import items_request
 
-ESI_BASE = "https://esi.evetech.net/latest"
-TYCOON_BASE = "https://evetycoon.com/api/v1/market"
-HEADERS = {"Content-Type": "application/json"}
-TEMP_DIR = "temp"
 
-if not os.path.exists(TEMP_DIR):
-    os.makedirs(TEMP_DIR)
+JITA_REGION_ID = 10000002
+INDICATOR_SIZE = (300, 60)
 
 def parse_input_text(input_text):
     data = []
@@ -23,33 +20,47 @@ def parse_input_text(input_text):
 
 
 def get_type_ids(names):
-    url = f"{ESI_BASE}/universe/ids/"
-    res = requests.post(url, json=names, headers=HEADERS)
-    res.raise_for_status()
-    return {item["name"]: item["id"] for item in res.json().get("inventory_types", [])}
+    return items_request.get_type_ids(names)
+
+
+def _window_stats(history):
+    prices = history["average"]
+    return {
+        "current": prices.iloc[-1],
+        "max": history["highest"].max(),
+        "min": history["lowest"].min(),
+        "avg": prices.mean()
+    }
+
+
+def get_market_stats_many(region_id, type_ids, days=30):
+    update_history(region_id, type_ids)
+    history = read_history(region_id, type_ids)
+
+    return {
+        int(type_id): _window_stats(group.tail(days))
+        for type_id, group in history.groupby("type_id", sort=False)
+        if not group.empty
+    }
 
 
 def get_market_stats(region_id, type_id, days=30):
-    url = f"{TYCOON_BASE}/history/{region_id}/{type_id}"
+    return get_market_stats_many(region_id, [type_id], days=days).get(int(type_id))
+
+
+@lru_cache(maxsize=None)
+def load_fonts():
     try:
-        res = requests.get(url)
-        history = res.json()[-days:]
-        prices = [d['average'] for d in history]
-        return {
-            "current": prices[-1],
-            "max": max(d['highest'] for d in history),
-            "min": min(d['lowest'] for d in history),
-            "avg": sum(prices) / len(prices)
-        }
-    except:
-        return None
+        return ImageFont.truetype("arial.ttf", 18), ImageFont.truetype("arial.ttf", 22)
+    except OSError:
+        font = ImageFont.load_default()
+        return font, font
 
 
 
-def generate_indicator(item, index):
-    W, H = 300, 60
-    img = Image.new('RGB', (W, H), "#1A1A1A")
-    draw = ImageDraw.Draw(img)
+def draw_indicator(draw, item):
+    W, H = INDICATOR_SIZE
+    draw.rectangle([0, 0, W - 1, H - 1], fill="#1A1A1A")
 
     x_start, x_end = 20, 280
     y_top, y_bot = 20, 40
@@ -70,7 +81,7 @@ def generate_indicator(item, index):
     half_width = (x_end - x_start) / 2
 
     if p_avg <= 0:
-        return None
+        return False
 
     down_pct = (p_avg - p_min) / p_avg
     up_pct = (p_max - p_avg) / p_avg
@@ -112,9 +123,14 @@ def generate_indicator(item, index):
         fill="#00FFFF"
     )
 
-    path = os.path.join(TEMP_DIR, f"ind_{index}.png")
-    img.save(path)
-    return path
+    return True
+
+
+def generate_indicator(item):
+    img = Image.new('RGB', INDICATOR_SIZE, "#1A1A1A")
+    if not draw_indicator(ImageDraw.Draw(img), item):
+        return None
+    return img
 
 
 
@@ -127,11 +143,12 @@ def create_final_report(data_list):
     report = Image.new('RGB', (width, total_height), "#111111")
     draw = ImageDraw.Draw(report)
 
-    try:
-        font = ImageFont.truetype("arial.ttf", 18)
-        font_bold = ImageFont.truetype("arial.ttf", 22)
-    except:
-        font = font_bold = ImageFont.load_default()
+    font, font_bold = load_fonts()
+
+    # One scratch tile reused for every row: drawing in tile coordinates keeps the rounding of the fractional
+    # marker positions identical to a standalone indicator.
+    indicator = Image.new('RGB', INDICATOR_SIZE, "#1A1A1A")
+    indicator_draw = ImageDraw.Draw(indicator)
 
     col_x = [40, 280, 380, 480, 580, 700, 850, 950]
     headers = ["Name", "Qty", "Min", "Avg", "Max", "Current", "Diff %", "Market Visual"]
@@ -148,7 +165,7 @@ def create_final_report(data_list):
         if i % 2 == 0:
             draw.rectangle([0, y, width, y + row_height], fill="#181818")
 
-        diff = ((item['price_current'] - item['price_avg']) / item['price_avg']) * 100
+        diff = ((item['price_current'] - item['price_avg']) / item['price_avg']) * 100 if item['price_avg'] else 0.0
         diff_text = f"{diff:+.1f}%"
         diff_color = "#00FF00" if diff >= 0 else "#FF4444"
 
@@ -162,12 +179,11 @@ def create_final_report(data_list):
 
         draw.line([(0, y + row_height), (width, y + row_height)], fill="#222222", width=1)
 
-        ind_path = generate_indicator(item, i)
-        ind_img = Image.open(ind_path)
-        report.paste(ind_img, (col_x[7], y + 10))
+        if draw_indicator(indicator_draw, item):
+            report.paste(indicator, (col_x[7], y + 10))
 
     final_path = "market_final_report.png"
-    report.save(final_path)
+    report.save(final_path, compress_level=3)
     return final_path
 
 
@@ -179,11 +195,13 @@ def run_report(input_text):
     processed_data = []
     print("Fetching data and generating items...")
 
-    for i, it in enumerate(raw_items):
+    stats_map = get_market_stats_many(JITA_REGION_ID, [tid for tid in name_to_id.values() if tid])
+
+    for it in raw_items:
         tid = name_to_id.get(it['name'])
         if not tid: continue
 
-        stats = get_market_stats(10000002, tid)
+        stats = stats_map.get(int(tid))
         if stats:
             item_data = {
                 "name": it['name'],
@@ -194,7 +212,6 @@ def run_report(input_text):
                 "price_avg": stats['avg']
             }
             processed_data.append(item_data)
-        time.sleep(0.1)
 
     if processed_data:
         final_file = create_final_report(processed_data)
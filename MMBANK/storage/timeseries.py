@@ -0,0 +1,214 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from MMBANK.utils.http_client import DEFAULT_MAX_WORKERS, DEFAULT_RATE_PER_SEC, TokenBucket, fetch_many
+from MMBANK.utils.response_cache import cached_get_json
+
+TYCOON_HISTORY_URL = "https://evetycoon.com/api/v1/market/history"
+STORE_DIR = "MMBANK/data/timeseries"
+
+HISTORY_COLUMNS = ["date", "average", "highest", "lowest", "order_count", "volume"]
+HISTORY_RENAME = {"orderCount": "order_count"}
+DATE_FORMAT = "%Y%m%d"
+
+
+def _history_dir(region_id: int, type_id: int, store_dir: str = STORE_DIR) -> str:
+    return os.path.join(store_dir, "history", f"region={int(region_id)}", f"type={int(type_id)}")
+
+
+def _snapshot_dir(region_id: int, day, store_dir: str = STORE_DIR) -> str:
+    return os.path.join(store_dir, "snapshots", f"region={int(region_id)}", f"date={pd.Timestamp(day):%Y-%m-%d}")
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def history_parts(region_id: int, type_id: int, store_dir: str = STORE_DIR) -> list:
+    path = _history_dir(region_id, type_id, store_dir)
+    if not os.path.isdir(path):
+        return []
+
+    parts = []
+    for file_name in os.listdir(path):
+        if not (file_name.startswith("part-") and file_name.endswith(".parquet")):
+            continue
+        # part-<first day>-<last day>.parquet, so range queries can skip files without opening them.
+        start, end = file_name[len("part-"):-len(".parquet")].split("-")
+        parts.append((pd.Timestamp(start), pd.Timestamp(end), os.path.join(path, file_name)))
+
+    return sorted(parts)
+
+
+def last_history_date(region_id: int, type_id: int, store_dir: str = STORE_DIR):
+    parts = history_parts(region_id, type_id, store_dir)
+    return max(end for _, end, _ in parts) if parts else None
+
+
+def normalize_history(payload: list) -> pd.DataFrame:
+    df = pd.DataFrame(payload).rename(columns=HISTORY_RENAME)
+    if df.empty:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    dates = df["date"]
+    unit = "ms" if pd.api.types.is_numeric_dtype(dates) else None
+    df["date"] = pd.to_datetime(dates, unit=unit, utc=True).dt.tz_localize(None).dt.normalize()
+
+    return df.reindex(columns=HISTORY_COLUMNS).sort_values("date").drop_duplicates("date", keep="last")
+
+
+def get_history(
+    region_id: int,
+    type_id: int,
+    bypass_cache: bool = False,
+    rate_limiter: TokenBucket | None = None,
+) -> pd.DataFrame | None:
+    url = f"{TYCOON_HISTORY_URL}/{region_id}/{type_id}"
+    payload = cached_get_json(url, "evetycoon/history", bypass_cache=bypass_cache, rate_limiter=rate_limiter)
+
+    if payload is None:
+        return None
+
+    return normalize_history(payload)
+
+
+def append_history(df: pd.DataFrame, region_id: int, type_id: int, store_dir: str = STORE_DIR) -> int:
+    last = last_history_date(region_id, type_id, store_dir)
+    if last is not None:
+        df = df[df["date"] > last]
+
+    if df.empty:
+        return 0
+
+    first, final = df["date"].min(), df["date"].max()
+    path = os.path.join(_history_dir(region_id, type_id, store_dir),
+                        f"part-{first.strftime(DATE_FORMAT)}-{final.strftime(DATE_FORMAT)}.parquet")
+    _write_parquet(df[HISTORY_COLUMNS], path)
+
+    return len(df)
+
+
+def compact_history(region_id: int, type_id: int, store_dir: str = STORE_DIR):
+    parts = history_parts(region_id, type_id, store_dir)
+    if len(parts) < 2:
+        return
+
+    df = pd.concat([pd.read_parquet(path) for _, _, path in parts], ignore_index=True)
+    first, final = parts[0][0], max(end for _, end, _ in parts)
+
+    merged = os.path.join(_history_dir(region_id, type_id, store_dir),
+                          f"part-{first.strftime(DATE_FORMAT)}-{final.strftime(DATE_FORMAT)}.parquet")
+    _write_parquet(df, merged)
+
+    for _, _, path in parts:
+        if path != merged:
+            os.remove(path)
+
+
+def update_history(
+    region_id: int,
+    type_ids,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_per_sec: float = DEFAULT_RATE_PER_SEC,
+    store_dir: str = STORE_DIR,
+    today=None,
+) -> dict:
+    # Market history is published per completed UTC day, so a type stored up to yesterday is current.
+    today = pd.Timestamp(today or datetime.now(timezone.utc).date())
+    latest_complete = today - timedelta(days=1)
+
+    stale = sorted({
+        int(t) for t in type_ids
+        if pd.notna(t) and (last_history_date(region_id, t, store_dir) or pd.Timestamp.min) < latest_complete
+    })
+
+    limiter = TokenBucket(rate_per_sec)
+    histories = fetch_many(
+        lambda type_id: get_history(region_id, type_id, rate_limiter=limiter),
+        stale,
+        max_workers=max_workers,
+    )
+
+    appended = {}
+    for type_id, df in zip(stale, histories):
+        if df is not None:
+            appended[type_id] = append_history(df[df["date"] <= latest_complete], region_id, type_id, store_dir)
+
+    return appended
+
+
+def read_history(region_id: int, type_ids, start=None, end=None, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    start = pd.Timestamp(start) if start is not None else pd.Timestamp.min
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.max
+
+    frames = []
+    for type_id in type_ids:
+        for part_start, part_end, path in history_parts(region_id, type_id, store_dir):
+            if part_end < start or part_start > end:
+                continue
+            df = pd.read_parquet(path, filters=[("date", ">=", start), ("date", "<=", end)])
+            df.insert(0, "type_id", int(type_id))
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["type_id"] + HISTORY_COLUMNS)
+
+    return pd.concat(frames, ignore_index=True).sort_values(["type_id", "date"], ignore_index=True)
+
+
+def average_daily_volume(region_id: int, type_ids, days: int = 30, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    history = read_history(region_id, type_ids, store_dir=store_dir)
+    if history.empty:
+        return pd.DataFrame(columns=["type_id", "daily_volume"])
+
+    # History has no rows for days without trades, so the window total is spread over the whole window.
+    latest = history.groupby("type_id")["date"].transform("max")
+    recent = history[history["date"] > latest - timedelta(days=days)]
+
+    return (recent.groupby("type_id")["volume"].sum() / days).rename("daily_volume").reset_index()
+
+
+def append_snapshot(df: pd.DataFrame, region_id: int, taken_at=None, store_dir: str = STORE_DIR) -> str:
+    taken_at = pd.Timestamp(taken_at or datetime.now(timezone.utc).replace(tzinfo=None))
+
+    df = df.copy()
+    df.insert(0, "taken_at", taken_at)
+
+    path = os.path.join(_snapshot_dir(region_id, taken_at, store_dir), f"part-{taken_at:%H%M%S%f}.parquet")
+    _write_parquet(df, path)
+
+    return path
+
+
+def read_snapshots(region_id: int, start=None, end=None, type_ids=None, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    region_dir = os.path.join(store_dir, "snapshots", f"region={int(region_id)}")
+    if not os.path.isdir(region_dir):
+        return pd.DataFrame()
+
+    start = pd.Timestamp(start) if start is not None else pd.Timestamp.min
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.max
+
+    frames = []
+    for day_dir in sorted(os.listdir(region_dir)):
+        day = pd.Timestamp(day_dir[len("date="):])
+        if day + timedelta(days=1) <= start or day > end:
+            continue
+
+        for file_name in sorted(os.listdir(os.path.join(region_dir, day_dir))):
+            if file_name.endswith(".parquet"):
+                frames.append(pd.read_parquet(os.path.join(region_dir, day_dir, file_name)))
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df[(df["taken_at"] >= start) & (df["taken_at"] <= end)]
+    if type_ids is not None:
+        df = df[df["item_id"].isin(list(type_ids))]
+
+    return df.reset_index(drop=True)
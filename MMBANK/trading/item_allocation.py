@@ -1,13 +1,31 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from MMBANK.storage.timeseries import average_daily_volume, update_history
+
 pd.set_option("display.max_columns", None)
 pd.set_option("display.max_rows", None)
 pd.set_option("display.width", None)
 pd.set_option("display.max_colwidth", None)
 
 
+ALLOCATION_COLUMNS = [
+    "name",
+    "unit_cost",
+    "initial_inventory",
+    "best_single_strategy",
+    "best_single_profit",
+    "expected_profit",
+    "profit_std",
+]
+JITA_REGION_ID = 10000002
+
+
 class Strategy:
     def __init__(self, name, price, demand_rate):
         self.name = name
@@ -15,29 +33,91 @@ class Strategy:
         self.demand_rate = demand_rate
 
 
-def simulate_strategy(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, n_simulations=1000,
-                      seed=28):
-    rng = np.random.default_rng(seed)
-    profits = []
+def _next_path_start(draws, initial_inventory, horizon):
+    cum = np.concatenate([[0], np.cumsum(draws)])
+    positions = np.arange(len(draws))
+    window_end = np.minimum(positions + horizon, len(draws))
 
-    for _ in range(n_simulations):
-        inventory = initial_inventory
-        total_profit = 0.0
+    # A path runs the full horizon unless its window sells out; only those windows need the sell-out search.
+    next_start = np.where(positions + horizon <= len(draws), positions + horizon, -1)
+    selling = np.flatnonzero(cum[window_end] - cum[positions] >= initial_inventory)
+    next_start[selling] = np.searchsorted(cum, cum[selling] + initial_inventory, side="left")
+
+    return next_start
+
+
+def _path_starts(next_start, n_paths):
+    # Pointer doubling: after k rounds `starts` holds the first 2**k path starts and `jump` skips 2**k paths at once.
+    # Paths that run past the drawn stream jump to a sink past its end.
+    sink = len(next_start) + 1
+    jump = np.append(np.where(next_start < 0, sink, next_start), [sink, sink])
+    starts = np.zeros(1, dtype=np.int64)
+
+    while len(starts) <= n_paths:
+        starts = np.concatenate([starts, jump[starts]])
+        jump = jump[jump]
+
+    return starts[:n_paths + 1]
+
+
+def _replay_demand(rng, demand_rate, initial_inventory, horizon, n_simulations):
+    # The scalar simulator stops drawing once a path sells out; replay the same stream so results match per seed.
+    limit = n_simulations * horizon
+    expected_days = horizon if demand_rate <= 0 else min(horizon, int(np.ceil(initial_inventory / demand_rate)) + 2)
+
+    draws = rng.poisson(demand_rate, size=min(limit, n_simulations * expected_days))
+    starts = _path_starts(_next_path_start(draws, initial_inventory, horizon), n_simulations)
 
-        for t in range(horizon):
-            demand = rng.poisson(strategy.demand_rate)
-            sales = min(demand, inventory)
-            inventory -= sales
+    while starts[-1] > len(draws):
+        extra = rng.poisson(demand_rate, size=min(limit - len(draws), max(horizon, len(draws))))
+        draws = np.concatenate([draws, extra])
+        starts = _path_starts(_next_path_start(draws, initial_inventory, horizon), n_simulations)
 
-            margin = strategy.price - unit_cost
-            reward = (margin * sales) - (holding_cost * inventory)
+    # Columns past the longest path are all zero demand after sell-out, so they add nothing to the profit.
+    width = int(np.diff(starts).max()) if n_simulations else 1
+    padded = np.concatenate([draws, np.zeros(width, dtype=draws.dtype)])
 
-            discounted_reward = reward * np.exp(-discount_rate * t)
-            total_profit += discounted_reward
+    return padded[starts[:-1, None] + np.arange(width)]
 
-            if inventory <= 0:
-                break
-        profits.append(total_profit)
+
+def discount_factors(discount_rate, horizon):
+    return np.exp(-discount_rate * np.arange(horizon))
+
+
+def _discounted_rewards(cum_demand, strategy, initial_inventory, unit_cost, holding_cost, discount_rate):
+    sold = np.minimum(cum_demand, initial_inventory)
+    sales = np.diff(sold, axis=-1, prepend=0)
+    inventory = initial_inventory - sold
+
+    margin = strategy.price - unit_cost
+    reward = (margin * sales) - (holding_cost * inventory)
+
+    return reward * discount_factors(discount_rate, cum_demand.shape[-1])
+
+
+def path_rewards(demand, strategy, initial_inventory, unit_cost, holding_cost, discount_rate):
+    return _discounted_rewards(np.cumsum(demand, axis=-1), strategy, initial_inventory, unit_cost, holding_cost,
+                               discount_rate)
+
+
+def simulate_profits(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, n_simulations=1000,
+                     seed=28):
+    if horizon <= 0:
+        return np.zeros(n_simulations, dtype=np.float64)
+    if initial_inventory <= 0:
+        return np.full(n_simulations, -holding_cost * initial_inventory, dtype=np.float64)
+
+    rng = np.random.default_rng(seed)
+    demand = _replay_demand(rng, strategy.demand_rate, initial_inventory, horizon, n_simulations)
+    rewards = path_rewards(demand, strategy, initial_inventory, unit_cost, holding_cost, discount_rate)
+
+    return np.cumsum(rewards, axis=1)[:, -1]
+
+
+def simulate_strategy(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, n_simulations=1000,
+                      seed=28):
+    profits = simulate_profits(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                               n_simulations=n_simulations, seed=seed)
 
     return {
         "strategy": strategy.name,
@@ -47,61 +127,272 @@ def simulate_strategy(strategy, initial_inventory, unit_cost, holding_cost, disc
     }
 
 
+def simulate_strategy_adaptive(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                               ci_target=None, ci_target_percent=None, batch_size=200, max_simulations=100_000,
+                               seed=28):
+    if ci_target is None and ci_target_percent is None:
+        raise ValueError("Either ci_target or ci_target_percent is required")
+
+    rng = np.random.default_rng(seed)
+    stats = RunningStats(())
+
+    while stats.count < max_simulations:
+        n = min(batch_size, max_simulations - stats.count)
+        demand = rng.poisson(strategy.demand_rate, size=(n, horizon))
+        rewards = path_rewards(demand, strategy, initial_inventory, unit_cost, holding_cost, discount_rate)
+        stats.update(rewards.sum(axis=1))
+
+        if ci_reached(stats.half_width(), stats.mean, ci_target, ci_target_percent):
+            break
+
+    return {
+        "strategy": strategy.name,
+        "expected_profit": float(stats.mean),
+        "profit_std": float(stats.std()),
+        "expected_time_to_sellout": estimate_time_to_sellout(strategy.demand_rate, initial_inventory),
+        "ci_half_width": float(stats.half_width()),
+        "n_simulations": stats.count,
+    }
+
+
 def estimate_time_to_sellout(demand_rate, inventory):
     if demand_rate == 0: return np.inf
     return inventory / demand_rate
 
 
-def simulate_allocation(strategies, allocations, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
-                        n_simulations=300):
-    total_profits = []
-    assigned_inventories = np.floor(np.array(allocations) * initial_inventory)
-
-    for _ in range(n_simulations):
-        total_profit = 0.0
-        for i, strat in enumerate(strategies):
-            if assigned_inventories[i] <= 0:
-                continue
-
-            res = simulate_strategy(
-                strategy=strat,
-                initial_inventory=int(assigned_inventories[i]),
-                unit_cost=unit_cost,
-                holding_cost=holding_cost,
-                discount_rate=discount_rate,
-                horizon=horizon,
-                n_simulations=1
+class AllocationEvaluator:
+    max_block_size = 4_000_000
+
+    def __init__(self, strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                 n_simulations=300, seed=28):
+        self.strategies = list(strategies)
+        self.initial_inventory = initial_inventory
+        self.unit_cost = unit_cost
+        self.holding_cost = holding_cost
+        self.discount_rate = discount_rate
+
+        # Common random numbers: every candidate allocation is scored against the same demand paths.
+        rng = np.random.default_rng(seed)
+        self.cum_demand = [
+            np.cumsum(rng.poisson(strat.demand_rate, size=(n_simulations, horizon)), axis=1)
+            for strat in self.strategies
+        ]
+        self._profits = [{} for _ in self.strategies]
+
+    def strategy_profits(self, i, units):
+        cache = self._profits[i]
+        missing = np.array(sorted({int(u) for u in units} - cache.keys()), dtype=np.int64)
+
+        cum_demand = self.cum_demand[i]
+        chunk = max(1, self.max_block_size // max(1, cum_demand.size))
+
+        for start in range(0, len(missing), chunk):
+            levels = missing[start:start + chunk]
+            rewards = _discounted_rewards(
+                cum_demand[None, :, :], self.strategies[i], np.maximum(levels, 0)[:, None, None],
+                self.unit_cost, self.holding_cost, self.discount_rate
             )
-            total_profit += res["expected_profit"]
-        total_profits.append(total_profit)
+            for level, profits in zip(levels, rewards.sum(axis=-1)):
+                cache[int(level)] = profits
+
+        return np.stack([cache[int(u)] for u in units])
+
+    def evaluate(self, allocations):
+        allocations = np.atleast_2d(np.asarray(allocations, dtype=np.float64))
+        units = np.floor(allocations * self.initial_inventory).astype(np.int64)
+
+        totals = sum(self.strategy_profits(i, units[:, i]) for i in range(len(self.strategies)))
+
+        return totals.mean(axis=1), totals.std(axis=1)
+
+
+def simplex_grid(n_strategies, step):
+    n_steps = int(round(1 / step))
+    points = []
+
+    def fill(prefix, remaining):
+        if len(prefix) == n_strategies - 1:
+            points.append(prefix + [remaining])
+            return
+        for k in range(remaining + 1):
+            fill(prefix + [k], remaining - k)
+
+    fill([], n_steps)
+    return np.array(points, dtype=np.float64) / n_steps
+
+
+def _local_grid(center, step, radius=2):
+    n = len(center)
+    axes = [np.arange(-radius, radius + 1)] * (n - 1)
+    offsets = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, n - 1)
+
+    head = center[:-1] + offsets * step
+    tail = 1 - head.sum(axis=1, keepdims=True)
+    points = np.hstack([head, tail])
+
+    return points[(points >= -1e-12).all(axis=1)].clip(0, 1)
+
+
+def simulate_allocation(strategies, allocations, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                        n_simulations=300, seed=28):
+    evaluator = AllocationEvaluator(strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                                    n_simulations=n_simulations, seed=seed)
+    means, stds = evaluator.evaluate(allocations)
 
     return {
-        "expected_profit": np.mean(total_profits),
-        "profit_std": np.std(total_profits)
+        "expected_profit": means[0],
+        "profit_std": stds[0]
     }
 
 
-def optimize_allocation_mc(strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, step=0.1):
+def optimize_allocation_mc(strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, step=0.1,
+                           n_simulations=300, seed=28, refinements=3, evaluator=None):
+    evaluator = evaluator or AllocationEvaluator(strategies, initial_inventory, unit_cost, holding_cost,
+                                                 discount_rate, horizon, n_simulations=n_simulations, seed=seed)
+
+    candidates = simplex_grid(len(strategies), step)
     best = None
-    for x1 in np.linspace(0, 1, int(1 / step) + 1):
-        for x2 in np.linspace(0, 1 - x1, int((1 - x1) / step) + 1 if (1 - x1) > 0 else 1):
-            x3 = max(0, 1 - x1 - x2)
-            allocations = [x1, x2, x3]
-
-            res = simulate_allocation(
-                strategies, allocations, initial_inventory,
-                unit_cost, holding_cost, discount_rate, horizon
-            )
 
-            if best is None or res["expected_profit"] > best["expected_profit"]:
-                best = {
-                    "allocations": allocations,
-                    "expected_profit": res["expected_profit"],
-                    "profit_std": res["profit_std"]
-                }
+    for _ in range(refinements + 1):
+        means, stds = evaluator.evaluate(candidates)
+        idx = int(np.argmax(means))
+
+        if best is None or means[idx] > best["expected_profit"]:
+            best = {
+                "allocations": candidates[idx].tolist(),
+                "expected_profit": means[idx],
+                "profit_std": stds[idx]
+            }
+
+        step = step / 4
+        if len(strategies) < 2 or step * initial_inventory < 1:
+            break
+        candidates = _local_grid(np.array(best["allocations"]), step)
+
     return best
 
 
+def _allocate_item(name, strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, step,
+                   n_simulations, seed):
+    evaluator = AllocationEvaluator(strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                                    n_simulations=n_simulations, seed=seed)
+    best = optimize_allocation_mc(strategies, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                                  step=step, evaluator=evaluator)
+    single_means, _ = evaluator.evaluate(np.eye(len(strategies)))
+
+    row = {
+        "name": name,
+        "unit_cost": unit_cost,
+        "initial_inventory": initial_inventory,
+        "best_single_strategy": strategies[int(np.argmax(single_means))].name,
+        "best_single_profit": float(single_means.max()),
+        "expected_profit": float(best["expected_profit"]),
+        "profit_std": float(best["profit_std"]),
+    }
+    for strat, share in zip(strategies, best["allocations"]):
+        row[f"alloc_{strat.name}"] = share
+
+    return row
+
+
+def _allocation_jobs(items, strategies, initial_inventory, holding_rate, discount_rate, horizon, step, n_simulations,
+                     seed):
+    items = items.reset_index(drop=True)
+    seeds = np.random.SeedSequence(seed).spawn(len(items))
+
+    jobs = []
+    for i, row in items.iterrows():
+        strats = strategies(row) if callable(strategies) else strategies
+        if not strats or pd.isna(row["unit_cost"]):
+            continue
+
+        inventory = initial_inventory
+        if "initial_inventory" in row and not pd.isna(row["initial_inventory"]):
+            inventory = int(row["initial_inventory"])
+
+        jobs.append((i, (row["name"], strats, inventory, row["unit_cost"], holding_rate * row["unit_cost"],
+                         discount_rate, horizon, step, n_simulations, seeds[i])))
+
+    return jobs
+
+
+def _run_allocation_jobs(jobs, max_workers=None):
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(_allocate_item, *args): i for i, args in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def iter_batch_allocation(items, strategies, initial_inventory, holding_rate, discount_rate, horizon, step=0.1,
+                          n_simulations=300, seed=28, max_workers=None):
+    jobs = _allocation_jobs(items, strategies, initial_inventory, holding_rate, discount_rate, horizon, step,
+                            n_simulations, seed)
+    yield from _run_allocation_jobs(jobs, max_workers=max_workers)
+
+
+def batch_allocation(items, strategies, initial_inventory, holding_rate, discount_rate, horizon, step=0.1,
+                     n_simulations=300, seed=28, max_workers=None, output_csv=None):
+    jobs = _allocation_jobs(items, strategies, initial_inventory, holding_rate, discount_rate, horizon, step,
+                            n_simulations, seed)
+
+    alloc_columns = dict.fromkeys(f"alloc_{strat.name}" for _, args in jobs for strat in args[1])
+    columns = ALLOCATION_COLUMNS + list(alloc_columns)
+    if output_csv is not None:
+        pd.DataFrame(columns=columns).to_csv(output_csv, index=False)
+
+    # Rows are appended to the CSV in completion order; the returned frame keeps the input order.
+    results = {}
+    for i, row in _run_allocation_jobs(jobs, max_workers=max_workers):
+        results[i] = row
+        print(f"[{len(results)}] {row['name']}: {row['expected_profit']:,.2f} ISK")
+        if output_csv is not None:
+            pd.DataFrame([row], columns=columns).to_csv(output_csv, mode="a", header=False, index=False)
+
+    return pd.DataFrame([results[i] for i in sorted(results)], columns=columns)
+
+
+def items_from_production(production_csv, market_csv=None):
+    df = pd.read_csv(production_csv).rename(columns={"Total_production_price": "unit_cost"})
+    df = df[["name", "item_id", "unit_cost"]]
+
+    if market_csv is not None:
+        market = pd.read_csv(market_csv).drop(columns=["name"])
+        df = df.merge(market, on="item_id", how="inner")
+
+    return df
+
+
+def market_strategies(row, sell_order_share, instant_sell_share):
+    # Daily demand is our share of the volume that actually trades (from market history), not of the resting book.
+    # The shares are inputs: a resting sell order fills far slower than dumping into buy orders.
+    strategies = []
+    for name, price_column, share in (
+            ("Sell order", "sellAvgFivePercent", sell_order_share),
+            ("Instant sell", "buyAvgFivePercent", instant_sell_share),
+    ):
+        demand_rate = share * row["daily_volume"]
+        if pd.isna(row.get(price_column)) or pd.isna(demand_rate) or demand_rate <= 0:
+            continue
+        strategies.append(Strategy(name, price=row[price_column], demand_rate=demand_rate))
+    return strategies
+
+
+def run_catalogue_batch(production_csv, market_csv, output_csv, sell_order_share, instant_sell_share,
+                        initial_inventory=1000, holding_rate=0.00666, discount_rate=0.0066, horizon=60,
+                        region_id=JITA_REGION_ID, history_days=30, max_workers=None):
+    catalogue = items_from_production(production_csv, market_csv)
+    update_history(region_id, catalogue["item_id"])
+    volumes = average_daily_volume(region_id, catalogue["item_id"], days=history_days)
+    catalogue = catalogue.merge(volumes.rename(columns={"type_id": "item_id"}), on="item_id", how="left")
+
+    def strategies(row):
+        return market_strategies(row, sell_order_share, instant_sell_share)
+
+    return batch_allocation(catalogue, strategies, initial_inventory=initial_inventory, holding_rate=holding_rate,
+                            discount_rate=discount_rate, horizon=horizon, max_workers=max_workers,
+                            output_csv=output_csv)
+
+
 def simulate_profit_path(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, seed=None):
     rng = np.random.default_rng(seed)
     inventory = initial_inventory
@@ -133,6 +424,113 @@ def monte_carlo_with_ci(strategy, initial_inventory, unit_cost, holding_cost, di
     return mean_path, ci_low, ci_high
 
 
+class RunningStats:
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+
+    def update(self, batch):
+        n = len(batch)
+        if n == 0:
+            return
+
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0)
+
+        # Chan et al. pairwise merge of (count, mean, M2).
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros_like(self.mean)
+
+    def half_width(self, z=1.96):
+        if self.count < 2:
+            return np.full_like(self.mean, np.inf)
+        return z * np.sqrt(self.m2 / (self.count - 1)) / np.sqrt(self.count)
+
+
+def ci_reached(half_width, mean, ci_target=None, ci_target_percent=None):
+    if ci_target is None and ci_target_percent is None:
+        return False
+    if ci_target is not None and half_width > ci_target:
+        return False
+    if ci_target_percent is not None and half_width > abs(mean) * ci_target_percent / 100:
+        return False
+    return True
+
+
+class PathReservoir:
+    def __init__(self, size, horizon, rng):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self.paths = np.empty((size, horizon), dtype=np.float64)
+
+    def update(self, batch):
+        n = len(batch)
+
+        fill = min(n, max(0, self.size - self.seen))
+        self.paths[self.seen:self.seen + fill] = batch[:fill]
+
+        # Algorithm R: row k of the stream replaces a random slot with probability size / (k + 1).
+        positions = self.seen + np.arange(fill, n)
+        slots = (self.rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+        keep = slots < self.size
+        for row, slot in zip(np.flatnonzero(keep) + fill, slots[keep]):
+            self.paths[slot] = batch[row]
+
+        self.seen += n
+
+    def quantiles(self, q):
+        return np.quantile(self.paths[:min(self.seen, self.size)], q, axis=0)
+
+
+def profit_path_chunks(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, n_simulations,
+                       chunk_size=10_000, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+
+    for start in range(0, n_simulations, chunk_size):
+        n = min(chunk_size, n_simulations - start)
+        demand = rng.poisson(strategy.demand_rate, size=(n, horizon))
+        rewards = path_rewards(demand, strategy, initial_inventory, unit_cost, holding_cost, discount_rate)
+        yield np.cumsum(rewards, axis=1)
+
+
+def monte_carlo_streaming(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                          n_simulations=500, chunk_size=200, seed=28, quantiles=None, reservoir_size=10_000,
+                          ci_target=None, ci_target_percent=None):
+    rng = np.random.default_rng(seed)
+    stats = RunningStats(horizon)
+    reservoir = PathReservoir(reservoir_size, horizon, rng) if quantiles is not None else None
+
+    for paths in profit_path_chunks(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon,
+                                    n_simulations, chunk_size=chunk_size, rng=rng):
+        stats.update(paths)
+        if reservoir is not None:
+            reservoir.update(paths)
+
+        # n_simulations is only a cap once a target is set; the final-day profit decides convergence.
+        if ci_reached(stats.half_width()[-1], stats.mean[-1], ci_target, ci_target_percent):
+            break
+
+    half_width = stats.half_width()
+    result = {
+        "mean": stats.mean,
+        "ci_low": stats.mean - half_width,
+        "ci_high": stats.mean + half_width,
+        "n_simulations": stats.count,
+    }
+    if reservoir is not None:
+        result["quantiles"] = dict(zip(quantiles, reservoir.quantiles(quantiles)))
+
+    return result
+
+
 def plot_profit_ci(mean, low, high, title):
     plt.figure(figsize=(10, 5))
     plt.plot(mean, label="Expected profit", color='blue')
@@ -179,4 +577,13 @@ if __name__ == "__main__":
 
     for strat in strategies:
         mean, low, high = monte_carlo_with_ci(strat, initial_inventory, unit_cost, holding_cost, discount_rate, horizon)
-        plot_profit_ci(mean, low, high, title=f"{item_name} Performance: {strat.name}")
\ No newline at end of file
+        plot_profit_ci(mean, low, high, title=f"{item_name} Performance: {strat.name}")
+
+    if "--catalogue" in sys.argv[1:]:
+        print("\n" + "=" * 50 + "\n")
+        print("Batch allocation over the T2 component catalogue...")
+        batch = run_catalogue_batch("MMBANK/data/industry/production_costs_T2_comp.csv",
+                                    "MMBANK/data/market/jita_t2_comp.csv",
+                                    "MMBANK/data/analysis/summary/allocation_T2_comp.csv",
+                                    sell_order_share=0.05, instant_sell_share=0.2)
+        print(batch.sort_values("expected_profit", ascending=False).head(10))
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+FUZZWORK_DIR = "MMBANK/data/fuzzwork"
+INDEX_DIRNAME = "index"
+INDEX_VERSION = 1
+N_ACTIVITIES = 12
+
+SOURCE_FILES = {
+    "activity": "industryActivity.csv",
+    "materials": "industryActivityMaterials.csv",
+    "products": "industryActivityProducts.csv",
+    "blueprints": "industryBlueprints.csv",
+}
+
+ARRAYS = [
+    "bp_ids",
+    "bp_slot",
+    "max_production_limit",
+    "activity_time",
+    "mat_offsets",
+    "mat_type",
+    "mat_qty",
+    "prod_offsets",
+    "prod_type",
+    "prod_qty",
+    "product_activities",
+    "product_bp",
+]
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_csr(keys: np.ndarray, n_keys: int, *columns) -> tuple:
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return (offsets,) + tuple(column[order] for column in columns)
+
+
+def build_blueprint_index(fuzzwork_dir: str = FUZZWORK_DIR) -> dict:
+    sources = {name: os.path.join(fuzzwork_dir, filename) for name, filename in SOURCE_FILES.items()}
+
+    activity_df = pd.read_csv(sources["activity"])
+    materials_df = pd.read_csv(sources["materials"])
+    products_df = pd.read_csv(sources["products"])
+    blueprints_df = pd.read_csv(sources["blueprints"])
+
+    bp_ids = np.unique(np.concatenate([
+        activity_df["typeID"].to_numpy(),
+        materials_df["typeID"].to_numpy(),
+        products_df["typeID"].to_numpy(),
+        blueprints_df["typeID"].to_numpy(),
+    ])).astype(np.int64)
+
+    max_type_id = int(max(bp_ids.max(), products_df["productTypeID"].max(), materials_df["materialTypeID"].max()))
+
+    bp_slot = np.full(max_type_id + 1, -1, dtype=np.int32)
+    bp_slot[bp_ids] = np.arange(len(bp_ids), dtype=np.int32)
+    n_keys = len(bp_ids) * N_ACTIVITIES
+
+    max_production_limit = np.zeros(len(bp_ids), dtype=np.int64)
+    max_production_limit[bp_slot[blueprints_df["typeID"].to_numpy()]] = blueprints_df["maxProductionLimit"].to_numpy()
+
+    activity_time = np.full((len(bp_ids), N_ACTIVITIES), -1, dtype=np.int64)
+    activity_time[bp_slot[activity_df["typeID"].to_numpy()], activity_df["activityID"].to_numpy()] = (
+        activity_df["time"].to_numpy()
+    )
+
+    mat_keys = bp_slot[materials_df["typeID"].to_numpy()].astype(np.int64) * N_ACTIVITIES + materials_df["activityID"].to_numpy()
+    mat_offsets, mat_type, mat_qty = build_csr(
+        mat_keys,
+        n_keys,
+        materials_df["materialTypeID"].to_numpy(dtype=np.int64),
+        materials_df["quantity"].to_numpy(dtype=np.int64),
+    )
+
+    prod_keys = bp_slot[products_df["typeID"].to_numpy()].astype(np.int64) * N_ACTIVITIES + products_df["activityID"].to_numpy()
+    prod_offsets, prod_type, prod_qty = build_csr(
+        prod_keys,
+        n_keys,
+        products_df["productTypeID"].to_numpy(dtype=np.int64),
+        products_df["quantity"].to_numpy(dtype=np.int64),
+    )
+
+    product_activities = np.unique(products_df["activityID"].to_numpy()).astype(np.int64)
+    product_bp = np.full((len(product_activities), max_type_id + 1), -1, dtype=np.int32)
+
+    for row, activity in enumerate(product_activities):
+        subset = products_df[products_df["activityID"] == activity].drop_duplicates(subset=["productTypeID"], keep="last")
+        product_bp[row, subset["productTypeID"].to_numpy()] = subset["typeID"].to_numpy()
+
+    return {
+        "bp_ids": bp_ids,
+        "bp_slot": bp_slot,
+        "max_production_limit": max_production_limit,
+        "activity_time": activity_time,
+        "mat_offsets": mat_offsets,
+        "mat_type": mat_type,
+        "mat_qty": mat_qty,
+        "prod_offsets": prod_offsets,
+        "prod_type": prod_type,
+        "prod_qty": prod_qty,
+        "product_activities": product_activities,
+        "product_bp": product_bp,
+    }
+
+
+def _manifest_is_current(manifest: dict, sources: dict) -> tuple[bool, bool]:
+    # Returns (current, touched); touched means a file was re-stamped with unchanged content.
+    if manifest.get("version") != INDEX_VERSION:
+        return False, False
+
+    touched = False
+    for name, path in sources.items():
+        entry = manifest.get("sources", {}).get(name)
+        if entry is None:
+            return False, False
+
+        signature = _file_signature(path)
+        if signature["size"] == entry["size"] and signature["mtime"] == entry["mtime"]:
+            continue
+
+        if _file_checksum(path) != entry["sha256"]:
+            return False, False
+
+        entry.update(signature)
+        touched = True
+
+    return True, touched
+
+
+def _write_manifest(manifest: dict, index_dir: str):
+    with open(os.path.join(index_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _write_index(arrays: dict, index_dir: str, sources: dict):
+    os.makedirs(index_dir, exist_ok=True)
+
+    for name in ARRAYS:
+        np.save(os.path.join(index_dir, f"{name}.npy"), arrays[name])
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "sources": {
+            name: {**_file_signature(path), "sha256": _file_checksum(path)}
+            for name, path in sources.items()
+        },
+    }
+
+    _write_manifest(manifest, index_dir)
+
+
+class BlueprintIndex:
+    def __init__(self, arrays: dict):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+        self.product_row = {int(activity): row for row, activity in enumerate(self.product_activities)}
+
+    def _slot(self, bp_id: int) -> int:
+        if bp_id < 0 or bp_id >= len(self.bp_slot):
+            return -1
+        return int(self.bp_slot[bp_id])
+
+    def blueprint_for(self, product_id: int, activity: int = 1) -> int | None:
+        row = self.product_row.get(activity)
+        if row is None or product_id < 0 or product_id >= self.product_bp.shape[1]:
+            return None
+
+        bp_id = int(self.product_bp[row, product_id])
+        return bp_id if bp_id >= 0 else None
+
+    def blueprints_for(self, product_ids, activity: int = 1) -> np.ndarray:
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        row = self.product_row.get(activity)
+        result = np.full(len(product_ids), -1, dtype=np.int64)
+
+        if row is None:
+            return result
+
+        in_range = (product_ids >= 0) & (product_ids < self.product_bp.shape[1])
+        result[in_range] = self.product_bp[row, product_ids[in_range]]
+        return result
+
+    def materials(self, bp_id: int, activity: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        slot = self._slot(bp_id)
+        if slot < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        key = slot * N_ACTIVITIES + activity
+        start, end = self.mat_offsets[key], self.mat_offsets[key + 1]
+        return self.mat_type[start:end], self.mat_qty[start:end]
+
+    def products(self, bp_id: int, activity: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        slot = self._slot(bp_id)
+        if slot < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        key = slot * N_ACTIVITIES + activity
+        start, end = self.prod_offsets[key], self.prod_offsets[key + 1]
+        return self.prod_type[start:end], self.prod_qty[start:end]
+
+    def output_quantity(self, bp_id: int, activity: int = 1) -> int:
+        _, quantities = self.products(bp_id, activity)
+        return int(quantities[-1]) if len(quantities) else 1
+
+    def time(self, bp_id: int, activity: int = 1) -> int | None:
+        slot = self._slot(bp_id)
+        if slot < 0:
+            return None
+
+        value = int(self.activity_time[slot, activity])
+        return value if value >= 0 else None
+
+    def production_limit(self, bp_id: int) -> int | None:
+        slot = self._slot(bp_id)
+        return int(self.max_production_limit[slot]) if slot >= 0 else None
+
+
+def load_blueprint_index(fuzzwork_dir: str = FUZZWORK_DIR, rebuild: bool = False) -> BlueprintIndex:
+    index_dir = os.path.join(fuzzwork_dir, INDEX_DIRNAME)
+    sources = {name: os.path.join(fuzzwork_dir, filename) for name, filename in SOURCE_FILES.items()}
+    manifest_path = os.path.join(index_dir, "manifest.json")
+
+    with _indexes_lock:
+        current = False
+        if not rebuild and os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            current, touched = _manifest_is_current(manifest, sources)
+            # Files touched without content changes get their new mtime stored, so later loads skip the rehash.
+            if current and touched:
+                _write_manifest(manifest, index_dir)
+
+        if current and fuzzwork_dir in _indexes:
+            return _indexes[fuzzwork_dir]
+
+        if current:
+            arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+        else:
+            arrays = build_blueprint_index(fuzzwork_dir)
+            _write_index(arrays, index_dir, sources)
+
+        _indexes[fuzzwork_dir] = BlueprintIndex(arrays)
+
+    return _indexes[fuzzwork_dir]
@@ -1,58 +1,82 @@
+import numpy as np
 import pandas as pd
 import json
 
+from MMBANK.utils.bp_index import FUZZWORK_DIR, N_ACTIVITIES, load_blueprint_index
+
 
 def request_bpo_data_fuzzwork(
     items_csv: str,
     output_csv: str,
-    products_csv: str = "MMBANK/data/fuzzwork/industryActivityProducts.csv",
-    materials_csv: str = "MMBANK/data/fuzzwork/industryActivityMaterials.csv",
-    activity_csv: str = "MMBANK/data/fuzzwork/industryActivity.csv",
+    fuzzwork_dir: str = FUZZWORK_DIR,
     activity: int = 1
 ):
     items_df = pd.read_csv(items_csv)
-    products_df = pd.read_csv(products_csv)
-    materials_df = pd.read_csv(materials_csv)
-    activity_df = pd.read_csv(activity_csv)
-
-    products_df = products_df[products_df["activityID"] == activity]
-    materials_df = materials_df[materials_df["activityID"] == activity]
-    activity_df = activity_df[activity_df["activityID"] == activity]
-
-    product_to_bpo = products_df.set_index("productTypeID")["typeID"].to_dict()
-
-    materials_grouped = (
-        materials_df.groupby("typeID")
-        .apply(
-            lambda x: x[["materialTypeID", "quantity"]]
-            .rename(columns={"materialTypeID": "type_id", "quantity": "quantity"})
-            .to_dict(orient="records")
-        )
-        .to_dict()
-    )
-
-    quantity_map = products_df.set_index("typeID")["quantity"].to_dict()
-
-    time_map = activity_df.set_index("typeID")["time"].to_dict()
+    index = load_blueprint_index(fuzzwork_dir)
 
     rows = []
 
-    for _, row in items_df.iterrows():
+    for row in items_df.to_dict(orient="records"):
         item_id = int(row["item_id"])
-        bpo_id = product_to_bpo.get(item_id)
+        bpo_id = index.blueprint_for(item_id, activity)
 
         if bpo_id is None:
             continue
 
+        mat_types, mat_qty = index.materials(bpo_id, activity)
+
         rows.append({
             "name": row["name"],
             "item_id": item_id,
             "volume_m3": row["volume_m3"],
             "BPO_name": None,
             "BPO_id": bpo_id,
-            "materials": json.dumps(materials_grouped.get(bpo_id, [])),
-            "base_time": time_map.get(bpo_id),
-            "quantity": quantity_map.get(bpo_id, 1)
+            "materials": json.dumps([
+                {"type_id": int(t), "quantity": int(q)} for t, q in zip(mat_types, mat_qty)
+            ]),
+            "base_time": index.time(bpo_id, activity),
+            "quantity": index.output_quantity(bpo_id, activity)
         })
 
     pd.DataFrame(rows).to_csv(output_csv, index=False)
+
+
+def fuzzwork_production_tables(
+    activity: int = 1,
+    fuzzwork_dir: str = FUZZWORK_DIR,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    index = load_blueprint_index(fuzzwork_dir)
+
+    keys = np.arange(len(index.bp_ids), dtype=np.int64) * N_ACTIVITIES + activity
+    prod_start = np.asarray(index.prod_offsets[keys])
+    prod_end = np.asarray(index.prod_offsets[keys + 1])
+
+    has_product = prod_end > prod_start
+    keys, prod_end = keys[has_product], prod_end[has_product]
+    slots = keys // N_ACTIVITIES
+
+    bpo_ids = np.asarray(index.bp_ids)[slots]
+    item_ids = np.asarray(index.prod_type)[prod_end - 1]
+    quantity = np.asarray(index.prod_qty)[prod_end - 1]
+    base_time = np.asarray(index.activity_time[slots, activity], dtype=np.float64)
+    base_time[base_time < 0] = np.nan
+
+    blueprints = pd.DataFrame({
+        "name": None,
+        "item_id": item_ids,
+        "BPO_id": bpo_ids,
+        "quantity": quantity,
+        "base_time": base_time,
+    })
+
+    starts = np.asarray(index.mat_offsets[keys])
+    lengths = np.asarray(index.mat_offsets[keys + 1]) - starts
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    materials = pd.DataFrame({
+        "bp": np.repeat(np.arange(len(blueprints), dtype=np.int64), lengths),
+        "type_id": np.asarray(index.mat_type)[positions],
+        "quantity": np.asarray(index.mat_qty)[positions].astype(np.float64),
+    })
+
+    return blueprints, materials
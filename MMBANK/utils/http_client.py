@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE_PER_SEC = 10.0
+DEFAULT_TIMEOUT = 15
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: float | None = None):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+
+        self.rate = rate_per_sec
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_sec)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def get_session(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET", "POST"),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            _session = session
+
+    return _session
+
+
+def fetch_many(fetch, keys, max_workers: int = DEFAULT_MAX_WORKERS, rate_limiter: TokenBucket | None = None) -> list:
+    keys = list(keys)
+    if not keys:
+        return []
+
+    def task(key):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return fetch(key)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as pool:
+        return list(pool.map(task, keys))
@@ -1,59 +1,151 @@
-import requests
+import os
+import threading
+
 import pandas as pd
-import time
+
+from MMBANK.utils.http_client import DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT, TokenBucket, fetch_many, get_session
+from MMBANK.utils.response_cache import CACHE_DIR, cached_get_json
 
 ESI_BASE = "https://esi.evetech.net/latest"
 HEADERS = {"Content-Type": "application/json"}
 
+IDS_CHUNK_SIZE = 500
+NAMES_CHUNK_SIZE = 1000
+# Capped at the shared session's connection pool so every worker keeps its keep-alive connection.
+ESI_MAX_WORKERS = DEFAULT_MAX_WORKERS
+ESI_RATE_PER_SEC = 100.0
+TYPE_INFO_PATH = os.path.join(CACHE_DIR, "type_info.csv")
+
+_type_info = None
+_type_info_lock = threading.Lock()
+
+
+def _chunks(values, size):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _load_type_info() -> dict:
+    global _type_info
+
+    with _type_info_lock:
+        if _type_info is None:
+            _type_info = {}
+
+            if os.path.exists(TYPE_INFO_PATH):
+                for row in pd.read_csv(TYPE_INFO_PATH).to_dict(orient="records"):
+                    volume = row["volume_m3"]
+                    _type_info[int(row["item_id"])] = {
+                        "name": row["name"] if pd.notna(row["name"]) else None,
+                        "volume_m3": volume if pd.notna(volume) else None,
+                    }
+
+    return _type_info
+
+
+def _update_type_info(updates: dict):
+    if not updates:
+        return
+
+    type_info = _load_type_info()
+
+    with _type_info_lock:
+        for type_id, fields in updates.items():
+            type_info.setdefault(int(type_id), {"name": None, "volume_m3": None}).update(
+                {k: v for k, v in fields.items() if v is not None}
+            )
+
+        os.makedirs(os.path.dirname(TYPE_INFO_PATH), exist_ok=True)
+        pd.DataFrame(
+            [{"name": v["name"], "item_id": k, "volume_m3": v["volume_m3"]} for k, v in type_info.items()],
+            columns=["name", "item_id", "volume_m3"],
+        ).to_csv(TYPE_INFO_PATH, index=False)
+
 
 def get_type_ids(names):
+    type_info = _load_type_info()
+    known = {v["name"]: k for k, v in type_info.items() if v["name"]}
+
+    result = {name: known[name] for name in names if name in known}
+    missing = [name for name in dict.fromkeys(names) if name not in known]
+
     url = f"{ESI_BASE}/universe/ids/"
-    response = requests.post(url, json=names, headers=HEADERS)
-    response.raise_for_status()
-    data = response.json()
-    return {item["name"]: item["id"] for item in data.get("inventory_types", [])}
+    updates = {}
 
+    for chunk in _chunks(missing, IDS_CHUNK_SIZE):
+        response = get_session().post(url, json=chunk, headers=HEADERS, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
 
-def get_type_volume(type_id):
-    url = f"{ESI_BASE}/universe/types/{type_id}/"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json().get("volume")
+        for item in data.get("inventory_types", []):
+            result[item["name"]] = item["id"]
+            updates[item["id"]] = {"name": item["name"]}
 
+    _update_type_info(updates)
 
-def request_items_data(input_csv_path, output_csv_path):
-    df = pd.read_csv(input_csv_path)
+    return result
 
-    if "name" not in df.columns:
-        raise ValueError("Input should include 'name'")
 
-    names = df["name"].dropna().unique().tolist()
+def _fetch_type_details(type_id, bypass_cache=False, rate_limiter=None):
+    url = f"{ESI_BASE}/universe/types/{type_id}/"
+    return cached_get_json(url, "esi/universe/types", bypass_cache=bypass_cache, rate_limiter=rate_limiter)
 
-    name_to_id = get_type_ids(names)
 
-    results = []
+def get_type_volumes(type_ids, max_workers: int = ESI_MAX_WORKERS, rate_per_sec: float = ESI_RATE_PER_SEC):
+    type_info = _load_type_info()
+    clean_ids = list(dict.fromkeys(int(tid) for tid in type_ids if pd.notna(tid)))
 
-    for name in names:
-        type_id = name_to_id.get(name)
-        if type_id is None:
-            results.append({
-                "name": name,
-                "item_id": None,
-                "volume_m3": None
-            })
+    result = {
+        tid: type_info[tid]["volume_m3"]
+        for tid in clean_ids
+        if tid in type_info and type_info[tid]["volume_m3"] is not None
+    }
+    missing = [tid for tid in clean_ids if tid not in result]
+
+    limiter = TokenBucket(rate_per_sec)
+    details = fetch_many(lambda tid: _fetch_type_details(tid, rate_limiter=limiter), missing, max_workers=max_workers)
+
+    updates = {}
+    for tid, info in zip(missing, details):
+        if info is None:
             continue
+        result[tid] = info.get("volume")
+        updates[tid] = {"name": info.get("name"), "volume_m3": info.get("volume")}
 
-        volume = get_type_volume(type_id)
+    _update_type_info(updates)
 
-        results.append({
+    return result
+
+
+def get_type_volume(type_id):
+    return get_type_volumes([type_id]).get(int(type_id))
+
+
+def resolve_types(names) -> pd.DataFrame:
+    names = list(dict.fromkeys(n for n in names if pd.notna(n)))
+
+    name_to_id = get_type_ids(names)
+    volumes = get_type_volumes(name_to_id.values())
+
+    rows = []
+    for name in names:
+        type_id = name_to_id.get(name)
+        rows.append({
             "name": name,
             "item_id": type_id,
-            "volume_m3": volume
+            "volume_m3": volumes.get(type_id) if type_id is not None else None,
         })
 
-        time.sleep(0.1)
+    return pd.DataFrame(rows, columns=["name", "item_id", "volume_m3"])
+
 
-    result_df = pd.DataFrame(results)
+def request_items_data(input_csv_path, output_csv_path):
+    df = pd.read_csv(input_csv_path)
+
+    if "name" not in df.columns:
+        raise ValueError("Input should include 'name'")
+
+    result_df = resolve_types(df["name"].dropna().unique().tolist())
     result_df.to_csv(output_csv_path, index=False)
 
 
@@ -61,11 +153,26 @@ def get_type_names(type_ids):
     if not type_ids:
         return {}
 
-    url = "https://esi.evetech.net/latest/universe/names/"
+    type_info = _load_type_info()
     clean_ids = list(set(int(tid) for tid in type_ids if pd.notna(tid)))
 
-    response = requests.post(url, json=clean_ids)
-    if response.status_code != 200:
-        return {tid: str(tid) for tid in clean_ids}
+    result = {tid: type_info[tid]["name"] for tid in clean_ids if tid in type_info and type_info[tid]["name"]}
+    missing = [tid for tid in clean_ids if tid not in result]
+
+    url = f"{ESI_BASE}/universe/names/"
+    updates = {}
+
+    for chunk in _chunks(missing, NAMES_CHUNK_SIZE):
+        response = get_session().post(url, json=chunk, headers=HEADERS, timeout=DEFAULT_TIMEOUT)
+        if response.status_code != 200:
+            result.update({tid: str(tid) for tid in chunk})
+            continue
+
+        for item in response.json():
+            result[item["id"]] = item["name"]
+            if item.get("category") == "inventory_type":
+                updates[item["id"]] = {"name": item["name"]}
+
+    _update_type_info(updates)
 
-    return {item["id"]: item["name"] for item in response.json()}
\ No newline at end of file
+    return result
@@ -0,0 +1,183 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from MMBANK.utils.bp_index import FUZZWORK_DIR, build_csr
+
+
+JUMPS_FILE = "mapSolarSystemJumps.csv"
+SYSTEMS_FILE = "mapSolarSystems.csv"
+
+HUB_SYSTEMS = {
+    "Jita": 30000142,
+    "Amarr": 30002187,
+    "Dodixie": 30002659,
+    "Rens": 30002510,
+    "Hek": 30002053,
+}
+
+# Security status is shown rounded to one decimal, so anything from 0.45 up is displayed as 0.5 and counts as high-sec.
+HIGHSEC_MIN = 0.45
+BFS_CACHE_SIZE = 256
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+class JumpGraph:
+    def __init__(self, systems: pd.DataFrame, jumps: pd.DataFrame):
+        systems = systems.sort_values("solarSystemID").reset_index(drop=True)
+
+        self.system_ids = systems["solarSystemID"].to_numpy(dtype=np.int64)
+        self.names = systems["solarSystemName"].to_numpy(dtype=object)
+        self.region_ids = systems["regionID"].to_numpy(dtype=np.int64)
+        self.security = systems["security"].astype(float).fillna(-1).to_numpy()
+        self.highsec = self.security >= HIGHSEC_MIN
+
+        src = np.searchsorted(self.system_ids, jumps["fromSolarSystemID"].to_numpy(dtype=np.int64))
+        dst = np.searchsorted(self.system_ids, jumps["toSolarSystemID"].to_numpy(dtype=np.int64))
+        self.offsets, self.neighbours = build_csr(src, len(self.system_ids), dst.astype(np.int32))
+
+        self._slots = {int(system_id): slot for slot, system_id in enumerate(self.system_ids)}
+        self._name_slots = {str(name).lower(): slot for slot, name in enumerate(self.names)}
+        self._bfs_cache = OrderedDict()
+        self._bfs_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.system_ids)
+
+    def slot(self, system) -> int:
+        # Systems can be given by ID or by name.
+        if isinstance(system, str):
+            slot = self._name_slots.get(system.lower())
+        else:
+            slot = self._slots.get(int(system))
+
+        if slot is None:
+            raise KeyError(f"Unknown solar system: {system}")
+        return slot
+
+    def _bfs(self, source: int, highsec_only: bool) -> tuple:
+        n = len(self.system_ids)
+        dist = np.full(n, -1, dtype=np.int32)
+        parent = np.full(n, -1, dtype=np.int32)
+
+        if highsec_only and not self.highsec[source]:
+            return dist, parent
+
+        allowed = self.highsec if highsec_only else np.ones(n, dtype=bool)
+        dist[source] = 0
+        frontier = np.array([source], dtype=np.int32)
+        depth = 0
+
+        # Level-synchronous BFS: each step expands the whole frontier at once through the CSR rows.
+        while len(frontier):
+            depth += 1
+            starts = self.offsets[frontier]
+            counts = self.offsets[frontier + 1] - starts
+            edge_idx = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            nodes = self.neighbours[edge_idx]
+            parents = np.repeat(frontier, counts)
+
+            fresh = (dist[nodes] < 0) & allowed[nodes]
+            nodes, first = np.unique(nodes[fresh], return_index=True)
+            dist[nodes] = depth
+            parent[nodes] = parents[fresh][first]
+            frontier = nodes.astype(np.int32)
+
+        return dist, parent
+
+    def bfs(self, system, highsec_only: bool = False) -> tuple:
+        key = (self.slot(system), highsec_only)
+
+        with self._bfs_lock:
+            if key in self._bfs_cache:
+                self._bfs_cache.move_to_end(key)
+                return self._bfs_cache[key]
+
+        result = self._bfs(*key)
+
+        with self._bfs_lock:
+            self._bfs_cache[key] = result
+            if len(self._bfs_cache) > BFS_CACHE_SIZE:
+                self._bfs_cache.popitem(last=False)
+
+        return result
+
+    def distance(self, origin, destination, highsec_only: bool = False) -> int | None:
+        dist, _ = self.bfs(origin, highsec_only)
+        jumps = int(dist[self.slot(destination)])
+        return jumps if jumps >= 0 else None
+
+    def distances(self, origin, destinations, highsec_only: bool = False) -> np.ndarray:
+        dist, _ = self.bfs(origin, highsec_only)
+        slots = [self.slot(system) for system in destinations]
+        return np.where(dist[slots] >= 0, dist[slots], np.nan)
+
+    def route(self, origin, destination, highsec_only: bool = False) -> list | None:
+        dist, parent = self.bfs(origin, highsec_only)
+        slot = self.slot(destination)
+        if dist[slot] < 0:
+            return None
+
+        path = [slot]
+        while parent[path[-1]] >= 0:
+            path.append(int(parent[path[-1]]))
+
+        return [int(self.system_ids[s]) for s in reversed(path)]
+
+    def within(self, origin, max_jumps: int, highsec_only: bool = False) -> pd.DataFrame:
+        dist, _ = self.bfs(origin, highsec_only)
+        slots = np.flatnonzero((dist >= 0) & (dist <= max_jumps))
+        slots = slots[np.argsort(dist[slots], kind="stable")]
+
+        return pd.DataFrame({
+            "solar_system_id": self.system_ids[slots],
+            "name": self.names[slots],
+            "region_id": self.region_ids[slots],
+            "security": self.security[slots],
+            "jumps": dist[slots],
+        })
+
+    def distance_matrix(self, systems: dict, highsec_only: bool = False) -> pd.DataFrame:
+        labels = list(systems)
+        matrix = np.vstack([self.distances(systems[label], systems.values(), highsec_only) for label in labels])
+        return pd.DataFrame(matrix, index=labels, columns=labels)
+
+    def hub_distances(self, highsec_only: bool = True) -> pd.DataFrame:
+        return self.distance_matrix(HUB_SYSTEMS, highsec_only)
+
+
+def load_jump_graph(fuzzwork_dir: str = FUZZWORK_DIR, reload: bool = False) -> JumpGraph:
+    with _graphs_lock:
+        if reload or fuzzwork_dir not in _graphs:
+            graph = JumpGraph(
+                pd.read_csv(os.path.join(fuzzwork_dir, SYSTEMS_FILE)),
+                pd.read_csv(os.path.join(fuzzwork_dir, JUMPS_FILE)),
+            )
+            # Hub-to-hub distances are asked for constantly, so their BFS trees are warmed up front.
+            for highsec_only in (False, True):
+                graph.hub_distances(highsec_only)
+            _graphs[fuzzwork_dir] = graph
+
+    return _graphs[fuzzwork_dir]
+
+
+def route_jumps(origin, destination, highsec_only: bool = True, fuzzwork_dir: str = FUZZWORK_DIR) -> int | None:
+    return load_jump_graph(fuzzwork_dir).distance(origin, destination, highsec_only)
+
+
+def hub_haul_rates(
+        home: str,
+        isk_per_m3_jump: float,
+        hubs: dict = HUB_SYSTEMS,
+        highsec_only: bool = True,
+        fuzzwork_dir: str = FUZZWORK_DIR,
+) -> dict:
+    # ISK per m3 to move goods between home and each hub, ready for HubMatrix.haul_costs; unreachable hubs cost inf.
+    graph = load_jump_graph(fuzzwork_dir)
+    jumps = graph.distances(hubs[home], hubs.values(), highsec_only)
+    return {hub: float(np.where(np.isnan(j), np.inf, j * isk_per_m3_jump)) for hub, j in zip(hubs, jumps)}
@@ -9,21 +9,29 @@ METHOD_TO_COLUMN = {
 }
 
 
-def combine_input(materials: dict, output_path: str) -> pd.DataFrame:
+def as_frame(source) -> pd.DataFrame:
+    if isinstance(source, pd.DataFrame):
+        return source
+    return pd.read_csv(source)
+
+
+def combine_input(materials, output_path: str | None = None) -> pd.DataFrame:
     frames = []
+    sources = materials.items() if isinstance(materials, dict) else materials
 
-    for csv_path, method in materials.items():
+    for source, method in sources:
         if method not in METHOD_TO_COLUMN:
             raise ValueError(f"Unknown pricing method: {method}")
 
         price_column = METHOD_TO_COLUMN[method]
 
-        df = pd.read_csv(csv_path)
+        df = as_frame(source)
+        label = "input frame" if isinstance(source, pd.DataFrame) else source
 
         required = {"name", "item_id", price_column}
         if not required.issubset(df.columns):
             raise ValueError(
-                f"{csv_path} must contain columns {required}"
+                f"{label} must contain columns {required}"
             )
 
         tmp = (
@@ -39,7 +47,8 @@ def combine_input(materials: dict, output_path: str) -> pd.DataFrame:
         .drop_duplicates(subset=["item_id"], keep="last")
     )
 
-    all_materials.to_csv(output_path, index=False)
+    if output_path is not None:
+        all_materials.to_csv(output_path, index=False)
 
     return all_materials
 
@@ -0,0 +1,187 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from MMBANK.utils.http_client import DEFAULT_TIMEOUT, TokenBucket, get_session
+
+
+CACHE_DIR = "MMBANK/data/cache"
+CACHE_PATH = os.path.join(CACHE_DIR, "http_cache.sqlite")
+MAX_ENTRIES = 50000
+
+DEFAULT_TTL = 300
+ENDPOINT_TTLS = {
+    "evetycoon/stats": 300,
+    "evetycoon/history": 6 * 3600,
+    "esi/markets/prices": 3600,
+    "esi/markets/orders": 300,
+    "esi/industry/systems": 3600,
+    "esi/universe/types": 30 * 24 * 3600,
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ResponseCache:
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES, ttls: dict | None = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                etag TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self.conn.commit()
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, endpoint: str, key: str) -> dict | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, etag, expires_at FROM responses WHERE endpoint = ? AND key = ?",
+                (endpoint, key),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self.conn.execute(
+                "UPDATE responses SET last_access = ? WHERE endpoint = ? AND key = ?",
+                (time.time(), endpoint, key),
+            )
+            self.conn.commit()
+
+        return {"payload": json.loads(row[0]), "etag": row[1], "expires_at": row[2]}
+
+    def put(self, endpoint: str, key: str, payload, etag: str | None, expires_at: float):
+        now = time.time()
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, key, json.dumps(payload), etag, expires_at, now),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, endpoint: str, key: str, expires_at: float):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE endpoint = ? AND key = ?",
+                (expires_at, time.time(), endpoint, key),
+            )
+            self.conn.commit()
+
+    def clear(self, endpoint: str | None = None):
+        with self.lock:
+            if endpoint is None:
+                self.conn.execute("DELETE FROM responses")
+            else:
+                self.conn.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            self.conn.commit()
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+
+        if excess > 0:
+            self.conn.execute(
+                """
+                DELETE FROM responses WHERE rowid IN (
+                    SELECT rowid FROM responses ORDER BY last_access ASC LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+
+
+def get_cache() -> ResponseCache:
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+
+    return _cache
+
+
+def _expires_at(response: requests.Response, ttl: float) -> float:
+    expires = response.headers.get("Expires")
+
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            pass
+
+    return time.time() + ttl
+
+
+def cached_get_json(
+    url: str,
+    endpoint: str,
+    key: str | None = None,
+    bypass_cache: bool = False,
+    cache: ResponseCache | None = None,
+    rate_limiter: TokenBucket | None = None,
+):
+    cache = cache or get_cache()
+    key = key or url
+    entry = cache.get(endpoint, key)
+
+    if entry is not None and not bypass_cache and entry["expires_at"] > time.time():
+        return entry["payload"]
+
+    headers = {}
+    if entry is not None and entry["etag"] and not bypass_cache:
+        headers["If-None-Match"] = entry["etag"]
+
+    # Only a real request spends a token; fresh cache hits return above without waiting on the limiter.
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+
+    try:
+        response = get_session().get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+    except requests.RequestException:
+        return None
+
+    ttl = cache.ttl_for(endpoint)
+
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(endpoint, key, _expires_at(response, ttl))
+        return entry["payload"]
+
+    if response.status_code != 200:
+        return None
+
+    try:
+        payload = response.json()
+    except ValueError:
+        return None
+
+    cache.put(endpoint, key, payload, response.headers.get("ETag"), _expires_at(response, ttl))
+
+    return payload
@@ -1,14 +1,20 @@
-from MMBANK.pipelines.production_profit import T2_react_full_cycle_profit, T2_comp_full_cycle_profit
+from MMBANK.pipelines.production_profit import T2_react_full_cycle_profit, T2_comp_full_cycle_profit, T2_comp_throughput
+from MMBANK.pipelines.production_profit import T2_comp_multi_hub_profit, T2_comp_facility_scan
+from MMBANK.pipelines.production_profit import T2_comp_production_plan
 from MMBANK.analysis.production_analysis import production_material_pie
+from MMBANK.pipelines.definitions import t2_react_pipeline, t2_comp_pipeline
 
-# T2_react_full_cycle_profit()
-# T2_comp_full_cycle_profit(method = "Full")
-# T2_comp_full_cycle_profit(method = "Buy")
-# T2_comp_full_cycle_profit(method = "Sell")
+# T2_react_full_cycle_profit(checkpoint = True)
+# T2_comp_full_cycle_profit(method = "Full", checkpoint = True)
+# T2_comp_full_cycle_profit(method = "Buy", checkpoint = True)
+# T2_comp_full_cycle_profit(method = "Sell", checkpoint = True)
 # production_material_pie('Oxygen Fuel Block')
+# t2_comp_pipeline("Full").run()
+# T2_comp_throughput(method = "Buy", TE_BPO = 0.04, TE_skills = 0.2)
+# T2_comp_production_plan(method = "Buy", lines = 10, horizon_hours = 24 * 7, budget = 2e9)
+# T2_comp_multi_hub_profit(method = "Buy", isk_per_m3_jump = 50)
+# T2_comp_facility_scan(method = "Buy", home = "Jita", max_jumps = 5)
+# T2_comp_full_cycle_profit(method = "Buy", facility_system = "Perimeter")
 
 
-#TODO: Profit per hour
 #TODO: Fix x-axis in subplots
-#TODO: Build model for choosing best set vy volume and limited production lines
-#TODO: production_material_pie add buy and custom method for plot
\ No newline at end of file
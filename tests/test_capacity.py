@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from MMBANK.analysis.capacity import plan_production
+
+
+def _table():
+    return pd.DataFrame({
+        "name": ["Good", "Missing quantity", "Missing cost"],
+        "sell_profit_isk": [100.0, 500.0, 300.0],
+        "Total_production_price": [1000.0, 1000.0, np.nan],
+        "quantity": [10.0, np.nan, 10.0],
+        "job_seconds": [3600.0, 3600.0, 3600.0],
+        "volume_m3": [1.0, 1.0, 1.0],
+        "sellVolume": [1000.0, 1000.0, 1000.0],
+    })
+
+
+def test_plan_skips_rows_with_missing_values():
+    plan = plan_production(_table(), lines=1, horizon_hours=5, budget=1e9)
+
+    assert list(plan["name"]) == ["Good"]
+    assert plan["runs"].iloc[0] == 5
+    assert plan["planned_profit"].iloc[0] == 5 * 10 * 100.0
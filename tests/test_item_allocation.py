@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from MMBANK.trading.item_allocation import Strategy, simulate_profits
+
+
+def scalar_profits(strategy, initial_inventory, unit_cost, holding_cost, discount_rate, horizon, n_simulations, seed):
+    rng = np.random.default_rng(seed)
+    profits = []
+
+    for _ in range(n_simulations):
+        inventory = initial_inventory
+        total_profit = 0.0
+
+        for t in range(horizon):
+            sales = min(rng.poisson(strategy.demand_rate), inventory)
+            inventory -= sales
+            reward = (strategy.price - unit_cost) * sales - holding_cost * inventory
+            total_profit += reward * np.exp(-discount_rate * t)
+
+            if inventory <= 0:
+                break
+        profits.append(total_profit)
+
+    return np.array(profits)
+
+
+@pytest.mark.parametrize("demand_rate, initial_inventory, horizon", [
+    (0, 10, 5),
+    (1, 1000, 60),
+    (16, 1000, 60),
+    (100, 1000, 60),
+    (400, 50, 7),
+])
+def test_vectorized_profits_replay_scalar_stream(demand_rate, initial_inventory, horizon):
+    args = (Strategy("x", 900, demand_rate), initial_inventory, 500, 3.0, 0.0066, horizon)
+
+    expected = scalar_profits(*args, n_simulations=300, seed=28)
+    profits = simulate_profits(*args, n_simulations=300, seed=28)
+
+    assert profits.mean() == expected.mean()
+    assert profits.std() == expected.std()
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+import MMBANK.utils.response_cache as response_cache
+from MMBANK.prices.request_prices import fetch_hub_prices
+from MMBANK.utils.http_client import TokenBucket
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, url):
+        self.url = url
+
+    def json(self):
+        return {"buyVolume": 1, "sellVolume": 2, "url": self.url}
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        return FakeResponse(url)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(response_cache, "get_session", lambda: session)
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(":memory:"))
+    return session
+
+
+@pytest.fixture
+def acquires(monkeypatch):
+    calls = []
+    monkeypatch.setattr(TokenBucket, "acquire", lambda self: calls.append(self))
+    return calls
+
+
+def test_cache_hit_skips_rate_limiter(session, acquires):
+    limiter = TokenBucket(1.0)
+
+    first = response_cache.cached_get_json("http://x/1", "evetycoon/stats", rate_limiter=limiter)
+    second = response_cache.cached_get_json("http://x/1", "evetycoon/stats", rate_limiter=limiter)
+
+    assert first == second
+    assert session.calls == 1
+    assert len(acquires) == 1
+
+
+def test_warm_fetch_hub_prices_does_not_acquire(session, acquires):
+    items = pd.DataFrame({"name": [f"t{i}" for i in range(20)], "item_id": range(20), "volume_m3": 1.0})
+
+    fetch_hub_prices(items, region_id=10000002)
+    assert session.calls == 20
+    assert len(acquires) == 20
+
+    acquires.clear()
+    warm = fetch_hub_prices(items, region_id=10000002)
+
+    assert session.calls == 20
+    assert acquires == []
+    assert warm["sellVolume"].tolist() == [2] * 20